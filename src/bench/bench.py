@@ -0,0 +1,135 @@
+import asyncio
+import multiprocessing
+import os
+import resource
+import socket
+import time
+from array import array
+
+from src.client.headless import Headless
+
+def resident():
+    try:
+        with open("/proc/self/statm") as reader:
+            return int(reader.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def rooms_for(clients, rooms):
+    members = [0] * rooms
+    for index in range(clients):
+        members[index % rooms] += 1
+    return members
+
+async def drive(url, directory, indices, total, rooms, messages, size, barrier, results):
+    members = rooms_for(total, rooms)
+    expected = sum((members[index % rooms] - 1) * messages for index in indices)
+    latencies = array("q")
+    finished = asyncio.Event()
+
+    def on_message(connection, message):
+        latencies.append(time.monotonic_ns() - message["sent"])
+        if len(latencies) >= expected:
+            finished.set()
+
+    baseline = resident()
+    clients = []
+    for index in indices:
+        client = Headless(directory)
+        network = client.get_module("network")
+        network.on("message", on_message)
+        connection = await network.relay(url)
+        await connection.send({"type": "join", "room": f"room-{index % rooms}"})
+        clients.append((index, connection))
+    per_client = (resident() - baseline) / max(len(clients), 1)
+
+    # Every process joins its rooms before anyone starts sending.
+    await asyncio.sleep(0.5)
+    await asyncio.get_running_loop().run_in_executor(None, barrier.wait)
+
+    body = "x" * size
+    started = time.monotonic_ns()
+    for sequence in range(messages):
+        for index, connection in clients:
+            await connection.send({"type": "message", "room": f"room-{index % rooms}", "sent": time.monotonic_ns(), "sequence": sequence, "body": body})
+    if expected:
+        try:
+            await asyncio.wait_for(finished.wait(), timeout=60)
+        except asyncio.TimeoutError:
+            pass
+    ended = time.monotonic_ns()
+
+    results.put({"latencies": latencies.tobytes(), "expected": expected, "started": started, "ended": ended, "memory": per_client})
+    for index, connection in clients:
+        await connection.network.stop()
+
+def worker(url, directory, indices, total, rooms, messages, size, barrier, results):
+    asyncio.run(drive(url, directory, indices, total, rooms, messages, size, barrier, results))
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+def wait_for_port(host, port, process, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not process.is_alive():
+            raise RuntimeError(f"Relay exited with code {process.exitcode} before listening")
+        try:
+            with socket.create_connection((host, port), timeout=0.1):
+                return
+        except OSError:
+            time.sleep(0.02)
+    raise TimeoutError(f"Relay did not listen on {host}:{port} within {timeout:.0f}s")
+
+def bench(url=None, clients=100, processes=1, rooms=10, messages=100, size=64, directory="."):
+    context = multiprocessing.get_context("fork")
+    relay = None
+    if url is None:
+        from src.server.relay import serve
+        port = free_port()
+        relay = context.Process(target=serve, args=("127.0.0.1", port, 1), daemon=True)
+        relay.start()
+        url = f"http://127.0.0.1:{port}/"
+        wait_for_port("127.0.0.1", port, relay)
+
+    barrier = context.Barrier(processes)
+    results = context.Queue()
+    workers = [
+        context.Process(target=worker, args=(url, directory, list(range(offset, clients, processes)), clients, rooms, messages, size, barrier, results))
+        for offset in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    reports = [results.get() for _ in workers]
+    for process in workers:
+        process.join()
+    if relay is not None:
+        relay.terminate()
+        relay.join()
+
+    latencies = array("q")
+    for report in reports:
+        latencies.frombytes(report["latencies"])
+    ordered = sorted(latencies)
+    expected = sum(report["expected"] for report in reports)
+    elapsed = (max(report["ended"] for report in reports) - min(report["started"] for report in reports)) / 1e9
+    return {
+        "clients": clients,
+        "processes": processes,
+        "sent": clients * messages,
+        "delivered": len(ordered),
+        "expected": expected,
+        "elapsed": elapsed,
+        "throughput": len(ordered) / elapsed if elapsed else 0.0,
+        "p50": percentile(ordered, 0.50) / 1e6,
+        "p99": percentile(ordered, 0.99) / 1e6,
+        "p999": percentile(ordered, 0.999) / 1e6,
+        "memory": sum(report["memory"] for report in reports) / len(reports),
+    }
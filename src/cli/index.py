@@ -2,7 +2,6 @@ import click
 import shutil
 import sys
 from pathlib import Path
-from src.client.client import Client
 
 def setup(path: Path):
     directory = path / ".shh"
@@ -35,13 +34,72 @@ def create(path):
 
 @cli.command(help="Start client.")
 @click.argument('path', type=click.Path(exists=True, path_type=Path), default=".")
-def start(path):
+@click.option("--metrics", "collect_metrics", is_flag=True, help="Collect performance metrics.")
+def start(path, collect_metrics):
     directory = path.absolute()
     if not (directory / ".shh").exists():
         click.echo(f"Error: .shh not found in {directory}")
         return
+    if collect_metrics:
+        from src.client.modules.metrics import metrics
+        metrics.enable()
+    from src.client.client import Client
     Client(directory).run()
 
+@cli.command(help="Show metrics from the last run.")
+@click.argument('path', type=click.Path(exists=True, path_type=Path), default=".")
+def stats(path):
+    from src.client.modules.metrics import load
+    snapshot = load(path.absolute() / ".shh" / "metrics.json")
+    if snapshot is None:
+        click.echo("No metrics recorded. Run 'shh start --metrics' first.")
+        return
+    for name, value in {**snapshot["counters"], **snapshot["gauges"]}.items():
+        click.echo(f"{name:<32}{value:>12}")
+    for name, summary in snapshot["histograms"].items():
+        click.echo(f"{name:<32}{summary['count']:>12}  p50 {summary['p50_us']:.0f}us  p99 {summary['p99_us']:.0f}us  max {summary['max_us']:.0f}us")
+
+@cli.command(help="Run relay server.")
+@click.option("--host", default="0.0.0.0", help="Address to listen on.")
+@click.option("--port", default=8765, type=int, help="Port to listen on.")
+@click.option("--workers", default=1, type=int, help="Worker processes (0 for one per core).")
+@click.option("--queue", default=1024, type=int, help="Outgoing queue size per connection.")
+def serve(host, port, workers, queue):
+    from src.server.relay import serve as run_relay
+    run_relay(host, port, workers, queue)
+
+@cli.command(help="Serve the client to browsers.")
+@click.argument('path', type=click.Path(exists=True, path_type=Path), default=".")
+@click.option("--host", default="127.0.0.1", help="Address to listen on (pass 0.0.0.0 to expose it to the network).")
+@click.option("--port", default=8000, type=int, help="Port to listen on.")
+@click.option("--limit", default=32, type=int, help="Maximum concurrent sessions.")
+@click.option("--public-url", default=None, help="URL browsers use to reach this server.")
+def web(path, host, port, limit, public_url):
+    directory = path.absolute()
+    if not (directory / ".shh").exists():
+        click.echo(f"Error: .shh not found in {directory}")
+        return
+    if host not in ("127.0.0.1", "localhost", "::1"):
+        click.echo(f"Warning: serving on {host}; anyone who can reach it gets an unauthenticated client with every profile in {directory / '.shh'}")
+    from src.server.web import serve as run_web
+    run_web(directory, host, port, limit, public_url)
+
+@cli.command(help="Run load benchmark.")
+@click.option("--url", default=None, help="Relay URL (starts a local relay if omitted).")
+@click.option("--clients", default=100, type=int, help="Virtual clients.")
+@click.option("--processes", default=1, type=int, help="Processes to spread clients over.")
+@click.option("--rooms", default=10, type=int, help="Rooms to spread clients over.")
+@click.option("--messages", default=100, type=int, help="Messages sent per client.")
+@click.option("--size", default=64, type=int, help="Message body size in bytes.")
+def bench(url, clients, processes, rooms, messages, size):
+    from src.bench.bench import bench as run_bench
+    report = run_bench(url, clients, processes, rooms, messages, size)
+    click.echo(f"Clients:    {report['clients']} in {report['processes']} process(es)")
+    click.echo(f"Delivered:  {report['delivered']}/{report['expected']} in {report['elapsed']:.2f}s")
+    click.echo(f"Throughput: {report['throughput']:.0f} msg/s")
+    click.echo(f"Latency:    p50 {report['p50']:.2f}ms, p99 {report['p99']:.2f}ms, p999 {report['p999']:.2f}ms")
+    click.echo(f"Memory:     {report['memory'] / 1024:.1f} KiB per client")
+
 if __name__ == "__main__":
     try:
         cli(prog_name="shh", standalone_mode=False)
@@ -1,23 +1,21 @@
 from textual.app import App
 from pathlib import Path
 
-from .modules.interface.interface import Interface
-from .modules.network.network import Network
-from .modules.profile.profile import Profile
-from .modules.graph.graph import Graph
+from .modules.lifecycle import register, shutdown
+from .modules.metrics import metrics
+from .modules.registry import Registry
 
 class Client(App):
     CSS_PATH = "style.tcss"
+    BINDINGS = [("f2", "toggle_metrics", "Metrics"), ("f3", "search", "Search")]
 
     def __init__(self, directory):
         self.directory = Path(directory)
         super().__init__()
         
-        self.modules = {}
-        self.modules["profile"] = Profile(self, self.directory)
-        self.modules["network"] = Network(self)
-        self.modules["graph"] = Graph(self)
-        self.modules["interface"] = Interface(self)
+        self.modules = Registry(__package__)
+        register(self.modules, self, self.directory)
+        self.modules.register("interface", ".modules.interface.interface:Interface", self)
 
     def on_mount(self):
         profile = self.get_module("profile")
@@ -31,6 +29,24 @@ class Client(App):
             else:
                 interface.switch_screen("profile_selector")
 
+    async def on_unmount(self):
+        await shutdown(self.modules)
+        if metrics.enabled:
+            metrics.dump(self.directory / ".shh" / "metrics.json")
+
+    def action_toggle_metrics(self):
+        overlays = self.screen.query("#metrics_overlay")
+        if overlays:
+            overlays.remove()
+        else:
+            from .modules.interface.other.components.overlay.overlay import Overlay
+            self.screen.mount(Overlay(id="metrics_overlay"))
+
+    def action_search(self):
+        interface = self.get_module("interface")
+        if interface and self.screen is not interface.screens.peek("search"):
+            interface.switch_screen("search")
+
     def get_module(self, name):
         return self.modules.get(name.lower())
 
@@ -0,0 +1,17 @@
+from pathlib import Path
+
+from .modules.lifecycle import register, shutdown
+from .modules.registry import Registry
+
+class Headless:
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+        self.modules = Registry(__package__)
+        register(self.modules, self, self.directory)
+
+    async def stop(self):
+        await shutdown(self.modules)
+
+    def get_module(self, name):
+        return self.modules.get(name.lower())
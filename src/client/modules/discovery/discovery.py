@@ -0,0 +1,154 @@
+import asyncio
+import random
+import socket
+import struct
+import time
+
+import msgpack
+
+from ..model.model import Peer
+from ..module import Module
+
+class Protocol(asyncio.DatagramProtocol):
+    def __init__(self, discovery):
+        self.discovery = discovery
+
+    def datagram_received(self, data, address):
+        self.discovery.received(data, address)
+
+class Discovery(Module):
+    def __init__(self, client, group="239.255.83.72", port=48372, interface="0.0.0.0", interval=1.0, maximum=30.0):
+        super().__init__("Discovery", client)
+        self.group = group
+        self.port = port
+        self.interface = interface
+        self.interval = interval
+        self.maximum = maximum
+        self.expiry = maximum * 3
+        self.identity = None
+        self.service_port = None
+        self.rooms = set()
+        self.peers = {}
+        self.listeners = []
+        self.changed = asyncio.Event()
+        self.transport = None
+        self.task = None
+        self.announcements = self.metrics.counter("announcements")
+        self.datagrams = self.metrics.counter("datagrams")
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def socket(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(("", self.port))
+        membership = struct.pack("4s4s", socket.inet_aton(self.group), socket.inet_aton(self.interface))
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(self.interface))
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        sock.setblocking(False)
+        return sock
+
+    async def start(self, identity, service_port, rooms=()):
+        self.identity = identity
+        self.service_port = service_port
+        self.rooms = set(rooms)
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: Protocol(self), sock=self.socket())
+        self.task = asyncio.create_task(self.announce_loop())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+
+    def join(self, room):
+        if room not in self.rooms:
+            self.rooms.add(room)
+            self.changed.set()
+
+    def leave(self, room):
+        if room in self.rooms:
+            self.rooms.discard(room)
+            self.changed.set()
+
+    def announcement(self):
+        # Everything this node has to say goes out in a single datagram per tick.
+        return msgpack.packb({"id": self.identity, "port": self.service_port, "rooms": sorted(self.rooms)})
+
+    async def announce_loop(self):
+        delay = self.interval
+        known = None
+        while True:
+            self.changed.clear()
+            self.transport.sendto(self.announcement(), (self.group, self.port))
+            self.announcements.inc()
+            self.expire()
+
+            # Back off while the peer set is stable; snap back to the base rate when it moves.
+            current = frozenset(self.peers)
+            delay = min(delay * 2, self.maximum) if current == known else self.interval
+            known = current
+            try:
+                await asyncio.wait_for(self.changed.wait(), timeout=delay * random.uniform(0.8, 1.2))
+                await asyncio.sleep(self.interval * random.uniform(0.8, 1.2))
+                delay = self.interval
+            except asyncio.TimeoutError:
+                pass
+
+    def received(self, data, address):
+        self.datagrams.inc()
+        try:
+            entry = msgpack.unpackb(data)
+            current = Peer(entry["id"], address[0], entry["port"], entry.get("rooms", []), time.monotonic())
+        except (ValueError, KeyError, TypeError, msgpack.UnpackException):
+            return
+        peer = current.name
+        if peer == self.identity:
+            return
+
+        previous = self.peers.get(peer)
+        self.peers[peer] = current
+        if previous is None:
+            self.feed(peer, current.host, current.port)
+            self.changed.set()
+            self.notify("found", peer)
+        elif previous.rooms != current.rooms or previous.port != current.port or previous.host != current.host:
+            # A peer that restarted on a new port must not be dialled at the old one until it expires.
+            if previous.port != current.port or previous.host != current.host:
+                self.feed(peer, current.host, current.port)
+            self.notify("changed", peer)
+
+    def feed(self, peer, host, port):
+        if self.client is None:
+            return
+        network = self.client.get_module("network")
+        if network:
+            network.addresses[peer] = (host, port)
+        graph = self.client.get_module("graph")
+        if graph:
+            graph.add_edge(self.identity, peer)
+
+    def expire(self):
+        deadline = time.monotonic() - self.expiry
+        for peer in [peer for peer, entry in self.peers.items() if entry.seen < deadline]:
+            del self.peers[peer]
+            if self.client is not None:
+                network = self.client.get_module("network")
+                if network:
+                    network.addresses.pop(peer, None)
+                graph = self.client.get_module("graph")
+                if graph:
+                    graph.remove_edge(self.identity, peer)
+            self.notify("lost", peer)
+
+    def notify(self, event, peer):
+        for listener in list(self.listeners):
+            listener(event, peer)
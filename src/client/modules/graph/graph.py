@@ -1,5 +1,151 @@
+from collections import OrderedDict, deque
+
 from ..module import Module
 
 class Graph(Module):
-    def __init__(self, parent):
-        super().__init__("Graph", parent)
\ No newline at end of file
+    def __init__(self, parent, capacity=64):
+        super().__init__("Graph", parent)
+        self.capacity = capacity
+        self.ids = {}
+        self.nodes = []
+        self.edges = []
+        self.free = []
+        self.routes = OrderedDict()
+        self.lookups = self.metrics.histogram("route.lookup")
+        self.hits = self.metrics.counter("route.hits")
+        self.misses = self.metrics.counter("route.misses")
+
+    def node(self, peer):
+        index = self.ids.get(peer)
+        if index is None:
+            if self.free:
+                index = self.free.pop()
+                self.nodes[index] = peer
+                self.edges[index] = set()
+            else:
+                index = len(self.nodes)
+                self.nodes.append(peer)
+                self.edges.append(set())
+            self.ids[peer] = index
+        return index
+
+    def add_edge(self, first, second):
+        a, b = self.node(first), self.node(second)
+        if a == b or b in self.edges[a]:
+            return
+        self.edges[a].add(b)
+        self.edges[b].add(a)
+        self.invalidate_added(a, b)
+
+    def remove_edge(self, first, second):
+        a, b = self.ids.get(first), self.ids.get(second)
+        if a is None or b is None or b not in self.edges[a]:
+            return
+        self.edges[a].discard(b)
+        self.edges[b].discard(a)
+        self.invalidate_removed(a, b)
+
+    def remove_node(self, peer):
+        index = self.ids.get(peer)
+        if index is None:
+            return
+        for neighbour in list(self.edges[index]):
+            self.remove_edge(peer, self.nodes[neighbour])
+        self.routes.pop(index, None)
+        del self.ids[peer]
+        self.nodes[index] = None
+        self.free.append(index)
+
+    def neighbours(self, peer):
+        index = self.ids.get(peer)
+        if index is None:
+            return []
+        return [self.nodes[neighbour] for neighbour in self.edges[index]]
+
+    def invalidate_added(self, a, b):
+        # A new edge can only shorten paths, so trees are repaired in place from the far endpoint.
+        for source, (distance, parent, hop) in self.routes.items():
+            near, far = a, b
+            first, second = distance.get(near), distance.get(far)
+            if first is None and second is None:
+                continue
+            if first is None or (second is not None and second < first):
+                near, far, first, second = far, near, second, first
+            if second is not None and second <= first + 1:
+                continue
+
+            distance[far] = first + 1
+            parent[far] = near
+            hop[far] = far if near == source else hop[near]
+            queue = deque([far])
+            while queue:
+                current = queue.popleft()
+                step = distance[current] + 1
+                via = hop[current]
+                for neighbour in self.edges[current]:
+                    known = distance.get(neighbour)
+                    if known is None or known > step:
+                        distance[neighbour] = step
+                        parent[neighbour] = current
+                        hop[neighbour] = via
+                        queue.append(neighbour)
+
+    def invalidate_removed(self, a, b):
+        # Dropping an edge outside a shortest-path tree leaves that tree valid.
+        for source in list(self.routes):
+            _, parent, _ = self.routes[source]
+            if parent.get(b) == a or parent.get(a) == b:
+                del self.routes[source]
+
+    def tree(self, source):
+        cached = self.routes.get(source)
+        if cached is not None:
+            self.routes.move_to_end(source)
+            self.hits.inc()
+            return cached
+        self.misses.inc()
+
+        distance = {source: 0}
+        parent = {}
+        hop = {}
+        queue = deque([source])
+        edges = self.edges
+        while queue:
+            current = queue.popleft()
+            step = distance[current] + 1
+            via = hop.get(current)
+            for neighbour in edges[current]:
+                if neighbour not in distance:
+                    distance[neighbour] = step
+                    parent[neighbour] = current
+                    hop[neighbour] = neighbour if via is None else via
+                    queue.append(neighbour)
+
+        cached = (distance, parent, hop)
+        self.routes[source] = cached
+        if len(self.routes) > self.capacity:
+            self.routes.popitem(last=False)
+        return cached
+
+    def next_hop(self, source, target):
+        a, b = self.ids.get(source), self.ids.get(target)
+        if a is None or b is None or a == b:
+            return None
+        with self.lookups.time():
+            hop = self.tree(a)[2].get(b)
+        return None if hop is None else self.nodes[hop]
+
+    def shortest_path(self, source, target):
+        a, b = self.ids.get(source), self.ids.get(target)
+        if a is None or b is None:
+            return []
+        if a == b:
+            return [source]
+        with self.lookups.time():
+            _, parent, _ = self.tree(a)
+        if b not in parent:
+            return []
+        path = [b]
+        while path[-1] != a:
+            path.append(parent[path[-1]])
+        return [self.nodes[index] for index in reversed(path)]
@@ -0,0 +1,43 @@
+from pathlib import Path
+from urllib.parse import quote
+
+from ..module import Module
+from .other.log import Log
+
+class History(Module):
+    def __init__(self, client, directory):
+        super().__init__("History", client)
+        self.directory = Path(directory) / ".shh" / "history"
+        self.logs = {}
+        self.listeners = []
+        self.appends = self.metrics.histogram("append")
+        self.reads = self.metrics.histogram("read")
+
+    def log(self, room):
+        log = self.logs.get(room)
+        if log is None:
+            log = Log(self.directory / quote(room, safe=""))
+            self.logs[room] = log
+        return log
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def append(self, room, message):
+        with self.appends.time():
+            offset = self.log(room).append(message)
+        for listener in list(self.listeners):
+            listener(room, offset, message)
+        return offset
+
+    def read(self, room, offset, count=1):
+        with self.reads.time():
+            return self.log(room).read(offset, count)
+
+    def count(self, room):
+        return self.log(room).next
+
+    def close(self):
+        for log in self.logs.values():
+            log.close()
+        self.logs = {}
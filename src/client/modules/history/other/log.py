@@ -0,0 +1,84 @@
+import threading
+
+import msgpack
+
+from .segment import Segment
+
+class Log:
+    def __init__(self, directory, segment_bytes=8 * 1024 * 1024, retention=16):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.retention = retention
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.RLock()
+
+        bases = sorted(int(path.stem) for path in self.directory.glob("*.log"))
+        self.segments = [Segment(self.directory, base) for base in bases]
+        for segment in self.segments[:-1]:
+            segment.load()
+        for segment, following in zip(self.segments, self.segments[1:]):
+            segment.next = following.base
+        if self.segments:
+            self.segments[-1].recover()
+        else:
+            self.segments.append(Segment(self.directory, 0))
+        self.bases = [segment.base for segment in self.segments]
+
+    @property
+    def first(self):
+        return self.segments[0].base
+
+    @property
+    def next(self):
+        return self.segments[-1].next
+
+    def __len__(self):
+        return self.next - self.first
+
+    def append(self, message):
+        with self.lock:
+            return self.append_locked(message)
+
+    def append_locked(self, message):
+        active = self.segments[-1]
+        if active.size >= self.segment_bytes:
+            active = Segment(self.directory, active.next)
+            self.segments.append(active)
+            self.bases.append(active.base)
+            while len(self.segments) > self.retention:
+                self.segments.pop(0).remove()
+                self.bases.pop(0)
+        return active.append(msgpack.packb(message))
+
+    def locate(self, offset):
+        low, high = 0, len(self.bases) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.bases[middle] <= offset:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def read(self, offset, count=1):
+        with self.lock:
+            return self.read_locked(offset, count)
+
+    def read_locked(self, offset, count):
+        offset = max(offset, self.first)
+        messages = []
+        slot = self.locate(offset)
+        while slot < len(self.segments) and len(messages) < count:
+            segment = self.segments[slot]
+            for payload in segment.read(offset, count - len(messages)):
+                messages.append(msgpack.unpackb(payload))
+            offset = segment.next
+            slot += 1
+        return messages
+
+    def sync(self):
+        self.segments[-1].sync()
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
@@ -0,0 +1,117 @@
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from bisect import bisect_right
+
+RECORD = struct.Struct(">II")
+INDEX = struct.Struct(">QQ")
+
+class Segment:
+    def __init__(self, directory, base, interval=4096):
+        self.base = base
+        self.interval = interval
+        self.path = directory / f"{base:020d}.log"
+        self.index_path = directory / f"{base:020d}.index"
+        self.file = open(self.path, "a+b")
+        self.index_file = open(self.index_path, "a+b")
+        self.offsets = array("Q")
+        self.positions = array("Q")
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.next = base
+        self.map = None
+        self.mapped = 0
+
+    def load(self):
+        self.index_file.seek(0)
+        raw = self.index_file.read()
+        for offset, position in INDEX.iter_unpack(raw[:len(raw) - len(raw) % INDEX.size]):
+            self.offsets.append(offset)
+            self.positions.append(position)
+
+    def recover(self):
+        self.load()
+        # Drop index entries that point past the data actually on disk, then rescan the tail.
+        while self.positions and self.positions[-1] >= self.size:
+            self.offsets.pop()
+            self.positions.pop()
+        offset, position = (self.offsets[-1], self.positions[-1]) if self.offsets else (self.base, 0)
+
+        with open(self.path, "rb") as reader:
+            reader.seek(position)
+            while True:
+                header = reader.read(RECORD.size)
+                if len(header) < RECORD.size:
+                    break
+                length, checksum = RECORD.unpack(header)
+                payload = reader.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                position += RECORD.size + length
+                offset += 1
+
+        if position != self.size:
+            self.file.truncate(position)
+            self.size = position
+        self.next = offset
+        self.index_file.seek(0)
+        self.index_file.truncate()
+        for entry in zip(self.offsets, self.positions):
+            self.index_file.write(INDEX.pack(*entry))
+        self.index_file.flush()
+
+    def append(self, payload):
+        position = self.size
+        self.file.write(RECORD.pack(len(payload), zlib.crc32(payload)))
+        self.file.write(payload)
+        self.file.flush()
+        if not self.positions or position - self.positions[-1] >= self.interval:
+            self.offsets.append(self.next)
+            self.positions.append(position)
+            self.index_file.write(INDEX.pack(self.next, position))
+            self.index_file.flush()
+        self.size += RECORD.size + len(payload)
+        self.next += 1
+        return self.next - 1
+
+    def view(self):
+        if self.mapped < self.size:
+            if self.map is not None:
+                self.map.close()
+            self.map = mmap.mmap(self.file.fileno(), self.size, access=mmap.ACCESS_READ)
+            self.mapped = self.size
+        return self.map
+
+    def read(self, offset, count):
+        if offset < self.base or offset >= self.next or count <= 0:
+            return []
+        slot = bisect_right(self.offsets, offset) - 1
+        current, position = self.offsets[slot], self.positions[slot]
+        view = self.view()
+        payloads = []
+        while position < self.mapped and len(payloads) < count:
+            length, _ = RECORD.unpack_from(view, position)
+            start = position + RECORD.size
+            if current >= offset:
+                payloads.append(view[start:start + length])
+            position = start + length
+            current += 1
+        return payloads
+
+    def sync(self):
+        os.fsync(self.file.fileno())
+        os.fsync(self.index_file.fileno())
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+            self.mapped = 0
+        self.file.close()
+        self.index_file.close()
+
+    def remove(self):
+        self.close()
+        self.path.unlink(missing_ok=True)
+        self.index_path.unlink(missing_ok=True)
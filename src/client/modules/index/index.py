@@ -0,0 +1,78 @@
+import threading
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+from ..module import Module
+from .other.shard import Shard
+
+class Index(Module):
+    def __init__(self, client, directory):
+        super().__init__("Index", client)
+        self.directory = Path(directory) / ".shh" / "index"
+        self.history = client.get_module("history")
+        self.shards = {}
+        self.rebuilding = {}
+        self.lock = threading.Lock()
+        self.queries = self.metrics.histogram("query")
+        self.history.subscribe(self.on_append)
+
+    def shard(self, room):
+        with self.lock:
+            shard = self.shards.get(room)
+            created = shard is None
+            if created:
+                shard = Shard(self.directory / quote(room, safe=""), self.history.log(room))
+                self.shards[room] = shard
+        if created and shard.stale:
+            self.rebuild(room)
+        return shard
+
+    def rooms(self):
+        if not self.history.directory.exists():
+            return []
+        return [unquote(path.name) for path in self.history.directory.iterdir() if path.is_dir()]
+
+    def on_append(self, room, offset, message):
+        if not self.shard(room).add(offset, message, blocking=False):
+            self.rebuild(room)
+
+    def rebuild(self, room):
+        # Anything the shard missed (a crash, or appends before it was opened) is indexed off-thread.
+        with self.lock:
+            if room in self.rebuilding:
+                return
+            thread = threading.Thread(target=self.catch_up, args=(room,), daemon=True)
+            self.rebuilding[room] = thread
+        thread.start()
+
+    def catch_up(self, room):
+        try:
+            self.shards[room].catch_up()
+        finally:
+            with self.lock:
+                self.rebuilding.pop(room, None)
+
+    def search(self, query, rooms=None, limit=20):
+        with self.queries.time():
+            ranked = []
+            for room in rooms if rooms is not None else self.rooms():
+                shard = self.shard(room)
+                if shard.stale:
+                    self.rebuild(room)
+                ranked.extend((score, room, offset) for offset, score in shard.search(query, limit))
+            ranked.sort(reverse=True)
+            results = []
+            for score, room, offset in ranked[:limit]:
+                messages = self.history.read(room, offset)
+                if messages:
+                    results.append({"room": room, "offset": offset, "score": score, "message": messages[0]})
+            return results
+
+    def close(self):
+        # Closed shards stop their catch_up threads, which must be gone before History closes the logs.
+        for shard in list(self.shards.values()):
+            shard.close()
+        with self.lock:
+            threads = list(self.rebuilding.values())
+        for thread in threads:
+            thread.join()
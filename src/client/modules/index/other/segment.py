@@ -0,0 +1,87 @@
+import mmap
+import os
+from array import array
+from bisect import bisect_left
+
+import msgpack
+
+# A posting packs a message offset with its term frequency (capped at 63) into one integer.
+FREQUENCY_BITS = 6
+
+def write(directory, name, postings):
+    terms = []
+    values = array("Q")
+    for term in sorted(postings):
+        entries = postings[term]
+        terms.append((term, len(values), len(entries)))
+        if isinstance(entries, array):
+            values.extend(entries)
+        else:
+            values.extend((offset << FREQUENCY_BITS) | min(frequency, 63) for offset, frequency in entries)
+
+    for suffix, payload in (("postings", values.tobytes()), ("terms", msgpack.packb(terms))):
+        temporary = directory / f"{name}.{suffix}.tmp"
+        with open(temporary, "wb") as writer:
+            writer.write(payload)
+            writer.flush()
+            os.fsync(writer.fileno())
+        os.replace(temporary, directory / f"{name}.{suffix}")
+
+class Segment:
+    def __init__(self, directory, name):
+        self.directory = directory
+        self.name = name
+        self.terms = None
+        self.starts = None
+        self.counts = None
+        self.file = None
+        self.map = None
+
+    def load(self):
+        if self.terms is not None:
+            return
+        with open(self.directory / f"{self.name}.terms", "rb") as reader:
+            table = msgpack.unpackb(reader.read())
+        self.terms = [term for term, _, _ in table]
+        self.starts = array("Q", (start for _, start, _ in table))
+        self.counts = array("Q", (count for _, _, count in table))
+        self.file = open(self.directory / f"{self.name}.postings", "rb")
+        if os.fstat(self.file.fileno()).st_size:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @property
+    def size(self):
+        return (self.directory / f"{self.name}.postings").stat().st_size // 8
+
+    def packed(self, term):
+        self.load()
+        values = array("Q")
+        position = bisect_left(self.terms, term)
+        if position == len(self.terms) or self.terms[position] != term or self.map is None:
+            return values
+        start, count = self.starts[position], self.counts[position]
+        values.frombytes(self.map[start * 8:(start + count) * 8])
+        return values
+
+    def postings(self, term):
+        mask = (1 << FREQUENCY_BITS) - 1
+        return [(value >> FREQUENCY_BITS, value & mask) for value in self.packed(term)]
+
+    def items(self):
+        self.load()
+        for term in self.terms:
+            yield term, self.postings(term)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.terms = None
+
+    def remove(self):
+        self.close()
+        for suffix in ("terms", "postings"):
+            (self.directory / f"{self.name}.{suffix}").unlink(missing_ok=True)
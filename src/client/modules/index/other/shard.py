@@ -0,0 +1,213 @@
+import heapq
+import math
+import os
+import threading
+import zlib
+from array import array
+from bisect import bisect_left
+
+import msgpack
+
+from .segment import FREQUENCY_BITS, Segment, write
+from .tokenizer import tokenize
+
+class Shard:
+    def __init__(self, directory, log, flush_every=4096, merge_at=8, candidates=2000):
+        self.directory = directory
+        self.log = log
+        self.flush_every = flush_every
+        self.merge_at = merge_at
+        self.candidates = candidates
+        self.lock = threading.RLock()
+        self.merging = None
+        self.closed = False
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.checkpoint_path = self.directory / "checkpoint"
+        checkpoint = {"next": log.first, "segments": [], "documents": 0, "serial": 0}
+        if self.checkpoint_path.exists():
+            with open(self.checkpoint_path, "rb") as reader:
+                checkpoint.update(msgpack.unpackb(reader.read()))
+        self.serial = checkpoint["serial"]
+        self.segments = [Segment(self.directory, name) for name in checkpoint["segments"]]
+        self.next = checkpoint["next"]
+        self.documents = checkpoint["documents"]
+        self.buffer = {}
+        self.buffered = 0
+
+        # After a crash the log can lose a tail the index had already seen, and those offsets are
+        # then refilled with other messages; the shard starts over and the background rebuild redoes it.
+        last = self.next - 1
+        if self.next > log.next or (log.first <= last and checkpoint.get("last") not in (None, self.fingerprint(last))):
+            for segment in self.segments:
+                segment.remove()
+            self.segments = []
+            self.next = log.first
+            self.documents = 0
+            self.save()
+
+    @property
+    def stale(self):
+        return self.next < self.log.next
+
+    def add(self, offset, message, blocking=True):
+        # A busy lock means catch_up is running; it will pick this offset up itself.
+        if not self.lock.acquire(blocking=blocking):
+            return False
+        try:
+            # Only the next expected offset is taken; gaps are left to catch_up.
+            if self.closed or offset != self.next:
+                return False
+            body = message.get("body", "") if isinstance(message, dict) else message
+            for term, frequency in tokenize(str(body)).items():
+                self.buffer.setdefault(term, []).append((offset, frequency))
+            self.next += 1
+            self.documents += 1
+            self.buffered += 1
+            if self.buffered >= self.flush_every:
+                self.flush()
+            return True
+        finally:
+            self.lock.release()
+
+    def catch_up(self, page=1024):
+        while True:
+            with self.lock:
+                if self.closed:
+                    return
+                start = max(self.next, self.log.first)
+                self.next = start
+                if start >= self.log.next:
+                    return
+                messages = self.log.read(start, page)
+                for offset, message in enumerate(messages, start):
+                    self.add(offset, message)
+
+    def flush(self):
+        with self.lock:
+            if not self.buffer:
+                return
+            self.serial += 1
+            name = f"{self.serial:08d}"
+            write(self.directory, name, self.buffer)
+            self.segments.append(Segment(self.directory, name))
+            self.buffer = {}
+            self.buffered = 0
+            self.save()
+            self.schedule()
+
+    def schedule(self):
+        # Segments of similar size share a tier; a full tier is merged into one segment of the next,
+        # so each posting is rewritten once per tier rather than on every flush.
+        if self.merging is not None or self.closed:
+            return
+        tiers = {}
+        for segment in self.segments:
+            tiers.setdefault(int(math.log(max(segment.size, 1), self.merge_at)), []).append(segment)
+        for tier in sorted(tiers):
+            if len(tiers[tier]) >= self.merge_at:
+                # Merging happens off the append path; searches keep using the old segments until the swap.
+                self.merging = threading.Thread(target=self.merge, args=(tiers[tier][:self.merge_at],), daemon=True)
+                self.merging.start()
+                return
+
+    def merge(self, segments):
+        try:
+            # Private handles, so loading never races a search on the shared segment objects.
+            readers = [Segment(self.directory, segment.name) for segment in segments]
+            try:
+                for reader in readers:
+                    reader.load()
+                merged = {}
+                for term in set().union(*(reader.terms for reader in readers)):
+                    values = array("Q")
+                    for reader in readers:
+                        values.extend(reader.packed(term))
+                    merged[term] = array("Q", sorted(values))
+            finally:
+                for reader in readers:
+                    reader.close()
+            with self.lock:
+                self.serial += 1
+                name = f"{self.serial:08d}"
+            write(self.directory, name, merged)
+            with self.lock:
+                position = self.segments.index(segments[0])
+                self.segments = [segment for segment in self.segments if segment not in segments]
+                self.segments.insert(position, Segment(self.directory, name))
+                self.save()
+            for segment in segments:
+                segment.remove()
+        finally:
+            with self.lock:
+                self.merging = None
+                self.schedule()
+
+    def save(self):
+        temporary = self.checkpoint_path.with_suffix(".tmp")
+        with open(temporary, "wb") as writer:
+            writer.write(msgpack.packb({"next": self.next, "segments": [segment.name for segment in self.segments], "documents": self.documents, "serial": self.serial, "last": self.fingerprint(self.next - 1)}))
+            writer.flush()
+            os.fsync(writer.fileno())
+        os.replace(temporary, self.checkpoint_path)
+
+    def fingerprint(self, offset):
+        if offset < self.log.first or offset >= self.log.next:
+            return None
+        messages = self.log.read(offset, 1)
+        return zlib.crc32(msgpack.packb(messages[0])) if messages else None
+
+    def packed(self, term):
+        lists = [segment.packed(term) for segment in self.segments]
+        buffered = self.buffer.get(term)
+        if buffered:
+            lists.append(array("Q", ((offset << FREQUENCY_BITS) | min(frequency, 63) for offset, frequency in buffered)))
+        return [values for values in lists if values]
+
+    def search(self, query, limit=20):
+        with self.lock:
+            scores = {}
+            documents = max(self.documents, 1)
+            mask = (1 << FREQUENCY_BITS) - 1
+            first = self.log.first << FREQUENCY_BITS
+            terms = [(term, weight, self.packed(term)) for term, weight in tokenize(query).items()]
+            terms = [(sum(len(values) for values in lists), term, weight, lists) for term, weight, lists in terms]
+
+            # Rarest terms pick the candidates; very common terms only rescore them.
+            for frequency_total, term, weight, lists in sorted(terms, key=lambda entry: entry[0]):
+                if not frequency_total:
+                    continue
+                rarity = math.log(1 + documents / frequency_total)
+                common = frequency_total > documents // 10
+                if scores and common:
+                    for offset in list(scores):
+                        key = offset << FREQUENCY_BITS
+                        for values in lists:
+                            position = bisect_left(values, key)
+                            if position < len(values) and values[position] >> FREQUENCY_BITS == offset:
+                                frequency = values[position] & mask
+                                scores[offset] += weight * rarity * frequency / (frequency + 1.2)
+                    continue
+                candidates = [values[bisect_left(values, first):] for values in lists]
+                if common:
+                    # No rare term narrows the search, so only the newest postings become candidates.
+                    candidates = [heapq.nlargest(self.candidates, (value for values in candidates for value in values[-self.candidates:]))]
+                for values in candidates:
+                    for value in values:
+                        offset, frequency = value >> FREQUENCY_BITS, value & mask
+                        scores[offset] = scores.get(offset, 0.0) + weight * rarity * frequency / (frequency + 1.2)
+
+            # Newer messages win ties.
+            return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.flush()
+            merging = self.merging
+        # The merge needs the lock to swap its result in, so it is waited for outside it.
+        if merging is not None:
+            merging.join()
+        with self.lock:
+            for segment in self.segments:
+                segment.close()
@@ -0,0 +1,27 @@
+import re
+from collections import Counter
+
+WORD = re.compile(r"[A-Za-z0-9_$][A-Za-z0-9_$./\\:\-]*")
+SEPARATORS = re.compile(r"[./\\:\-]+")
+CAMEL = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+def tokenize(text):
+    terms = Counter()
+    for match in WORD.finditer(text):
+        raw = match.group().rstrip(".:-")
+        if not raw:
+            continue
+        terms[raw.lower()] += 1
+        # Paths and dotted names also index their components, identifiers their words.
+        for component in SEPARATORS.split(raw):
+            if component and component.lower() != raw.lower():
+                terms[component.lower()] += 1
+            for part in component.split("_"):
+                words = CAMEL.findall(part)
+                if part and part != component:
+                    terms[part.lower()] += 1
+                if len(words) > 1:
+                    for word in words:
+                        if len(word) > 1:
+                            terms[word.lower()] += 1
+    return terms
@@ -1,17 +1,15 @@
 from ..module import Module
-
-from .other.screens.introduction.introduction import Introduction    
-from .other.screens.profile_selector.profile_selector import ProfileSelector
+from ..registry import Registry
 
 class Interface(Module):
     def __init__(self, client):
         super().__init__("Interface", client)
-        
-        self.screens = {
-            "introduction": Introduction(self, id="introduction"),
-            "profile_selector": ProfileSelector(self, id="profile_selector")
-        }
-        self.current_screen = self.screens["introduction"]
+
+        self.screens = Registry(__package__)
+        self.screens.register("introduction", ".other.screens.introduction.introduction:Introduction", self, id="introduction")
+        self.screens.register("profile_selector", ".other.screens.profile_selector.profile_selector:ProfileSelector", self, id="profile_selector")
+        self.screens.register("search", ".other.screens.search.search:Search", self, id="search")
+        self.current_screen = None
 
     def switch_screen(self, screen_name):
         if screen_name in self.screens:
@@ -0,0 +1,28 @@
+from typing import Any
+
+from rich.text import Text
+
+from .....metrics import metrics
+from ..component import Component
+
+
+class Overlay(Component):
+    def __init__(self, **initialization_kwargs: Any) -> None:
+        super().__init__(**initialization_kwargs)
+
+    def on_mount(self) -> None:
+        self.set_interval(1.0, self.refresh)
+
+    def render(self) -> Text:
+        if not metrics.enabled:
+            return Text("Metrics disabled. Start with --metrics.", style="dim")
+
+        snapshot: dict[str, Any] = metrics.snapshot()
+        lines = Text(no_wrap=True, overflow="ellipsis", end="")
+        lines.append("METRICS\n", style="bold")
+        for name, value in {**snapshot["counters"], **snapshot["gauges"]}.items():
+            lines.append(f"{name:<28}{value:>12}\n")
+        for name, summary in snapshot["histograms"].items():
+            lines.append(f"{name:<28}{summary['count']:>12}\n")
+            lines.append(f"  p50 {summary['p50_us']:.0f}us  p99 {summary['p99_us']:.0f}us  max {summary['max_us']:.0f}us\n", style="dim")
+        return lines
@@ -0,0 +1,121 @@
+from collections import OrderedDict
+from typing import Any
+
+from rich.text import Text
+from textual.binding import Binding
+from textual.events import MouseScrollDown, MouseScrollUp, Resize
+
+from .....model.other.window import Window
+from ..component import Component
+
+
+class Transcript(Component):
+    DEFAULT_CSS = """
+    Transcript {
+        height: 1fr;
+    }
+    """
+
+    can_focus = True
+
+    BINDINGS = [
+        Binding("up", "scroll_lines(-1)", show=False),
+        Binding("down", "scroll_lines(1)", show=False),
+        Binding("pageup", "scroll_pages(-1)", show=False),
+        Binding("pagedown", "scroll_pages(1)", show=False),
+        Binding("home", "scroll_home", show=False),
+        Binding("end", "scroll_end", show=False),
+    ]
+
+    def __init__(self, history_instance: Any, room_name: str, page_size: int = 64, max_pages: int = 8, overscan: int = 16, **initialization_kwargs: Any) -> None:
+        super().__init__(**initialization_kwargs)
+        self.room_name: str = room_name
+        self.room_log = history_instance.log(room_name)
+        self.page_size: int = page_size
+        self.max_pages: int = max_pages
+        self.overscan: int = overscan
+        self.pages: OrderedDict = OrderedDict()
+        self.top: int = 0
+        self.follow: bool = True
+
+    def visible_height(self) -> int:
+        return max(self.size.height, 1)
+
+    def bounds(self) -> tuple[int, int]:
+        first: int = self.room_log.first
+        return first, max(first, self.room_log.next - self.visible_height())
+
+    def page(self, number: int) -> Window:
+        cached = self.pages.get(number)
+        if cached is not None:
+            self.pages.move_to_end(number)
+            return cached
+
+        # Retention can leave the log starting mid-page, so the page records where it really begins.
+        start: int = max(number * self.page_size, self.room_log.first)
+        wanted: int = (number + 1) * self.page_size - start
+        # Cached pages keep only the columns the transcript draws, not the decoded message dicts.
+        page: Window = Window.from_messages(start, self.room_log.read(start, wanted), self.room_name)
+        # Only full pages are immutable; the tail page is re-read until it fills up.
+        if len(page) == self.page_size:
+            self.pages[number] = page
+            if len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+        return page
+
+    def window(self, start: int, stop: int) -> list:
+        start = max(start, self.room_log.first)
+        stop = min(stop, self.room_log.next)
+        rows: list = []
+        for number in range(start // self.page_size, (stop - 1) // self.page_size + 1 if stop > start else 0):
+            page: Window = self.page(number)
+            rows.extend(page.rows(start - page.first, max(stop - page.first, 0)))
+        return rows
+
+    def render(self) -> Text:
+        first, last = self.bounds()
+        self.top = last if self.follow else min(max(self.top, first), last)
+        height: int = self.visible_height()
+
+        # Warm the pages just outside the viewport so small scrolls never touch storage.
+        self.window(self.top - self.overscan, self.top)
+        self.window(self.top + height, self.top + height + self.overscan)
+
+        lines = Text(no_wrap=True, overflow="ellipsis", end="")
+        for position, (sender, body) in enumerate(self.window(self.top, self.top + height)):
+            if position:
+                lines.append("\n")
+            lines.append(f"{sender} ", style="bold")
+            lines.append(body.replace("\n", " "))
+        return lines
+
+    def scroll_to_line(self, top: int) -> None:
+        first, last = self.bounds()
+        self.top = min(max(top, first), last)
+        self.follow = self.top >= last
+        self.refresh()
+
+    def action_scroll_lines(self, delta: int) -> None:
+        self.scroll_to_line(self.top + delta)
+
+    def action_scroll_pages(self, delta: int) -> None:
+        self.scroll_to_line(self.top + delta * self.visible_height())
+
+    def action_scroll_home(self) -> None:
+        self.scroll_to_line(self.room_log.first)
+
+    def action_scroll_end(self) -> None:
+        self.scroll_to_line(self.room_log.next)
+
+    def on_mouse_scroll_up(self, event: MouseScrollUp) -> None:
+        self.scroll_to_line(self.top - 3)
+
+    def on_mouse_scroll_down(self, event: MouseScrollDown) -> None:
+        self.scroll_to_line(self.top + 3)
+
+    def on_resize(self, event: Resize) -> None:
+        self.refresh()
+
+    def notify_appended(self) -> None:
+        if self.follow:
+            self.refresh()
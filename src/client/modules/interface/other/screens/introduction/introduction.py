@@ -1,9 +1,10 @@
 from typing import Any, Optional
 
-from textual import on
+from textual import on, work
 from textual.containers import Center, Horizontal, Middle, Vertical
 from textual.events import Key
 from textual.widgets import Button, ContentSwitcher, Input, Label
+from textual.worker import get_current_worker
 
 from ..screen import Screen
 
@@ -108,21 +109,39 @@ class Introduction(Screen):
         self.query_one("#back_btn", Button).disabled = (self.step == 1)
 
     def validate_username(self) -> None:
+        username_value: str = self.query_one("#username", Input).value.strip()
+        profile_module: Optional[Any] = self.interface.client.get_module("profile")
+
+        if not username_value or not profile_module:
+            self.show_validation(username_value, None, "")
+            return
+
+        self.lookup_username(profile_module, username_value)
+
+    @work(exclusive=True, thread=True, group="validation")
+    def lookup_username(self, profile_module: Any, username_value: str) -> None:
+        username_taken, suggestion = profile_module.check_username(username_value)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self.show_validation, username_value, username_taken, suggestion)
+
+    def show_validation(self, username_value: str, username_taken: Optional[bool], suggestion: str) -> None:
         username_input_widget: Input = self.query_one("#username", Input)
         status_message_label: Label = self.query_one("#status_msg", Label)
-        username_value: str = username_input_widget.value.strip()
-        profile_module: Optional[Any] = self.interface.client.get_module("profile")
+
+        # The input may have moved on while the worker ran; drop stale answers.
+        if username_input_widget.value.strip() != username_value:
+            return
 
         if not username_value:
             status_message_label.update("")
             return
-        
-        if not profile_module:
+
+        if username_taken is None:
             status_message_label.update("Profile module not available")
             return
 
-        if profile_module.exists(username_value):
-            self.current_suggestion = profile_module.suggest_username(username_value)
+        if username_taken:
+            self.current_suggestion = suggestion
             status_message_label.update(f"Username taken. Try: [b]{self.current_suggestion}[/] [dim](TAB to use)[/]")
             status_message_label.set_class(True, "error_msg")
             status_message_label.set_class(False, "success_msg")
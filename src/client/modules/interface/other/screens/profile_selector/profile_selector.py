@@ -1,9 +1,10 @@
 from typing import Any, Optional
 
-from textual import on
+from textual import on, work
 from textual.containers import Center, Horizontal, Middle, Vertical
 from textual.events import Key
 from textual.widgets import Button, ContentSwitcher, Input, Label, ListItem, ListView
+from textual.worker import get_current_worker
 
 from ..screen import Screen
 
@@ -13,36 +14,19 @@ class ProfileSelector(Screen):
         super().__init__(interface_instance, **initialization_kwargs)
         self.current_suggestion: str = ""
         self.validation_timer: Optional[Any] = None
+        self.matches: list[Any] = []
+        self.mounted_rows: int = 0
+        self.row_batch: int = 20
 
     def compose(self):
-        profile_module: Optional[Any] = self.interface.client.get_module("profile")
-        profiles_list: list[Any] = profile_module.data.get("profiles", []) if profile_module else []
-        
-        sorted_profiles: list[Any] = sorted(profiles_list, key=lambda profile_data: profile_data.get("isLastUsed", False), reverse=True)
-        
         with Center():
             with Middle():
                 with Vertical(id="modal-panel"):
                     with ContentSwitcher(initial="selector-list"):
                         with Vertical(id="selector-list"):
                             yield Label("SELECT PROFILE", classes="title")
+                            yield Input(placeholder="Filter profiles", id="profile_filter")
                             with ListView(id="profile_list"):
-                                for profile_data in sorted_profiles:
-                                    profile_username = profile_data["username"]
-                                    profile_alias = profile_data.get("social", {}).get("alias", profile_username)
-                                    profile_creation_date = profile_data.get("metadata", {}).get("created_at", "N/A")[:10]
-                                    is_last_used = profile_data.get("isLastUsed", False)
-                                    
-                                    with ListItem(id=f"user_{profile_username}"):
-                                        with Vertical(classes="card_container"):
-                                            with Horizontal():
-                                                yield Label(profile_alias, classes="card_alias")
-                                                if is_last_used:
-                                                    yield Label("LAST USED", classes="last_badge")
-                                            
-                                            yield Label(f"@{profile_username}", classes="card_username")
-                                            yield Label(f"Created: {profile_creation_date}", classes="card_date")
-                                
                                 with ListItem(id="create_new_trigger"):
                                     with Center():
                                         with Middle():
@@ -93,11 +77,16 @@ class ProfileSelector(Screen):
             self.finish_setup()
 
     @on(Input.Submitted)
-    def handle_submit(self) -> None:
+    def handle_submit(self, event: Input.Submitted) -> None:
+        if event.input.id == "profile_filter":
+            self.query_one("#profile_list", ListView).focus()
+            return
         self.finish_setup()
 
     def on_input_changed(self, event: Input.Changed) -> None:
-        if event.input.id == "username":
+        if event.input.id == "profile_filter":
+            self.refresh_list()
+        elif event.input.id == "username":
             if self.validation_timer:
                 self.validation_timer.stop()
             
@@ -117,14 +106,92 @@ class ProfileSelector(Screen):
             self.query_one(ContentSwitcher).current = "selector_create"
             self.query_one("#btn_group").display = True
             self.query_one("#username").focus()
-        elif event.item.id:
-            selected_username: str = event.item.id.replace("user_", "")
+        elif getattr(event.item, "profile_username", None):
+            selected_username: str = event.item.profile_username
             profile_module: Optional[Any] = self.interface.client.get_module("profile")
             if profile_module and profile_module.switch_profile(selected_username):
                 self.app.notify(f"Profile @{selected_username} active")
 
     def on_mount(self) -> None:
         self.query_one("#btn_group").display = False
+        profile_module: Optional[Any] = self.interface.client.get_module("profile")
+        if profile_module:
+            profile_module.subscribe(self.on_profile_changed)
+            # Other shh processes may share this userdata; a refresh is two stats when nothing changed.
+            self.set_interval(2.0, profile_module.refresh)
+        self.refresh_list()
+
+    def on_unmount(self) -> None:
+        profile_module: Optional[Any] = self.interface.client.get_module("profile")
+        if profile_module:
+            profile_module.unsubscribe(self.on_profile_changed)
+
+    def build_row(self, profile_data: Any) -> ListItem:
+        profile_username: str = profile_data["username"]
+        profile_alias: str = profile_data.get("social", {}).get("alias", profile_username)
+        profile_creation_date: str = profile_data.get("metadata", {}).get("created_at", "N/A")[:10]
+
+        last_badge: Label = Label("LAST USED", classes="last_badge")
+        last_badge.display = profile_data.get("isLastUsed", False)
+        row: ListItem = ListItem(
+            Vertical(
+                Horizontal(Label(profile_alias, classes="card_alias"), last_badge),
+                Label(f"@{profile_username}", classes="card_username"),
+                Label(f"Created: {profile_creation_date}", classes="card_date"),
+                classes="card_container",
+            )
+        )
+        row.profile_username = profile_username
+        return row
+
+    @work(exclusive=True, group="profile_list")
+    async def refresh_list(self) -> None:
+        profile_module: Optional[Any] = self.interface.client.get_module("profile")
+        filter_text: str = self.query_one("#profile_filter", Input).value
+        self.matches = profile_module.search.query(filter_text) if profile_module else []
+
+        last_used: Optional[Any] = profile_module.store.last_used if profile_module else None
+        if last_used is not None and last_used in self.matches:
+            self.matches.remove(last_used)
+            self.matches.insert(0, last_used)
+
+        profile_list: ListView = self.query_one("#profile_list", ListView)
+        await profile_list.remove_items(range(len(profile_list) - 1))
+        self.mounted_rows = 0
+        await self.mount_rows()
+
+    async def mount_rows(self) -> None:
+        # Rows are mounted a batch at a time as the highlight approaches the end of the list.
+        batch: list[Any] = self.matches[self.mounted_rows:self.mounted_rows + self.row_batch]
+        if batch:
+            start: int = self.mounted_rows
+            self.mounted_rows += len(batch)
+            profile_list: ListView = self.query_one("#profile_list", ListView)
+            await profile_list.insert(start, [self.build_row(profile_data) for profile_data in batch])
+
+    async def on_list_view_highlighted(self, event: ListView.Highlighted) -> None:
+        profile_list: ListView = self.query_one("#profile_list", ListView)
+        if profile_list.index is not None and profile_list.index >= self.mounted_rows - 3:
+            await self.mount_rows()
+
+    def on_profile_changed(self, event_name: str, profile_data: Any) -> None:
+        if event_name == "reload":
+            self.refresh_list()
+            return
+
+        profile_list: ListView = self.query_one("#profile_list", ListView)
+        for row in profile_list.query(ListItem):
+            profile_username: Optional[str] = getattr(row, "profile_username", None)
+            if profile_username:
+                row.query_one(".last_badge", Label).display = profile_username == profile_data["username"]
+
+        if event_name == "create":
+            filter_text: str = self.query_one("#profile_filter", Input).value
+            profile_module: Optional[Any] = self.interface.client.get_module("profile")
+            if profile_module and any(match is profile_data for match in profile_module.search.query(filter_text)):
+                self.matches.insert(0, profile_data)
+                profile_list.insert(0, [self.build_row(profile_data)])
+                self.mounted_rows += 1
 
     def tab_complete(self) -> None:
         username_input: Input = self.query_one("#username", Input)
@@ -136,21 +203,39 @@ class ProfileSelector(Screen):
             self.query_one("#alias", Input).focus()
 
     def validate_username(self) -> None:
+        username_value: str = self.query_one("#username", Input).value.strip()
+        profile_module: Optional[Any] = self.interface.client.get_module("profile")
+
+        if not username_value or not profile_module:
+            self.show_validation(username_value, None, "")
+            return
+
+        self.lookup_username(profile_module, username_value)
+
+    @work(exclusive=True, thread=True, group="validation")
+    def lookup_username(self, profile_module: Any, username_value: str) -> None:
+        username_taken, suggestion = profile_module.check_username(username_value)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self.show_validation, username_value, username_taken, suggestion)
+
+    def show_validation(self, username_value: str, username_taken: Optional[bool], suggestion: str) -> None:
         username_input_widget: Input = self.query_one("#username", Input)
         status_message_label: Label = self.query_one("#status_msg", Label)
-        username_value: str = username_input_widget.value.strip()
-        profile_module: Optional[Any] = self.interface.client.get_module("profile")
+
+        # The input may have moved on while the worker ran; drop stale answers.
+        if username_input_widget.value.strip() != username_value:
+            return
 
         if not username_value:
             status_message_label.update("")
             return
-        
-        if not profile_module:
+
+        if username_taken is None:
             status_message_label.update("Profile module not available")
             return
 
-        if profile_module.exists(username_value):
-            self.current_suggestion = profile_module.suggest_username(username_value)
+        if username_taken:
+            self.current_suggestion = suggestion
             status_message_label.update(f"Username taken. Try: [b]{self.current_suggestion}[/] [dim](TAB to use)[/]")
             status_message_label.set_class(True, "error_msg")
             status_message_label.set_class(False, "success_msg")
@@ -0,0 +1,68 @@
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from .room import Room
+
+
+class Seen:
+    def __init__(self, capacity: int = 4096, ttl: float = 60.0) -> None:
+        self.capacity = capacity
+        self.ttl = ttl
+        self.entries: OrderedDict = OrderedDict()
+
+    def add(self, identifier: str) -> bool:
+        now = time.monotonic()
+        self.evict(now)
+        if identifier in self.entries:
+            return False
+        self.entries[identifier] = now
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return True
+
+    def evict(self, now: float) -> None:
+        entries = self.entries
+        while entries:
+            identifier, seen_at = next(iter(entries.items()))
+            if now - seen_at < self.ttl:
+                break
+            entries.popitem(last=False)
+
+
+class Broadcast:
+    def __init__(self, room: Room, local: Any, send: Callable[[Any, dict], Any], fanout: int = 4, seen: Optional[Seen] = None) -> None:
+        self.room = room
+        self.local = local
+        self.send = send
+        self.fanout = fanout
+        self.seen = seen if seen is not None else Seen()
+
+    def children(self, origin: Any, node: Any) -> list:
+        order, positions = self.room.ordering()
+        position = positions.get(node)
+        if position is None:
+            return []
+        base = positions.get(origin, position)
+        count = len(order)
+        relative = (position - base) % count
+        first = relative * self.fanout + 1
+        return [order[(base + child) % count] for child in range(first, min(first + self.fanout, count))]
+
+    def publish(self, body: Any) -> dict:
+        message = {"type": "room.message", "room": self.room.name, "id": uuid.uuid4().hex, "origin": self.local, "body": body}
+        self.seen.add(message["id"])
+        self.forward(message)
+        return message
+
+    def receive(self, message: dict) -> Optional[dict]:
+        if not self.seen.add(message["id"]):
+            return None
+        self.forward(message)
+        return message
+
+    def forward(self, message: dict) -> None:
+        for child in self.children(message["origin"], self.local):
+            if child != self.local:
+                self.send(child, message)
@@ -1,7 +1,37 @@
 class Room:
+    __slots__ = ("name", "description", "peers", "order", "positions")
+
     def __init__(self, name: str, description: str = "") -> None:
         self.name = name
         self.description = description
-        self.peers = []
+        self.peers = {}
+        self.order = None
+        self.positions = None
+
+    def join(self, peer, info=None) -> bool:
+        if peer in self.peers:
+            self.peers[peer] = info
+            return False
+        self.peers[peer] = info
+        self.order = None
+        return True
+
+    def leave(self, peer) -> bool:
+        if peer not in self.peers:
+            return False
+        del self.peers[peer]
+        self.order = None
+        return True
+
+    def has(self, peer) -> bool:
+        return peer in self.peers
+
+    def __len__(self) -> int:
+        return len(self.peers)
 
-    def 
\ No newline at end of file
+    def ordering(self):
+        # Every member sorts the same way, so all of them derive the same spanning tree.
+        if self.order is None:
+            self.order = sorted(self.peers)
+            self.positions = {peer: position for position, peer in enumerate(self.order)}
+        return self.order, self.positions
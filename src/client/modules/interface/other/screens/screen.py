@@ -1,3 +1,4 @@
+import time
 from typing import Any
 
 from textual.screen import Screen as Textual_Screen
@@ -6,4 +7,9 @@ from textual.screen import Screen as Textual_Screen
 class Screen(Textual_Screen):
     def __init__(self, interface_instance: Any, **initialization_kwargs: Any) -> None:
         self.interface: Any = interface_instance
-        super().__init__(**initialization_kwargs)
\ No newline at end of file
+        self.created_at: int = time.perf_counter_ns()
+        super().__init__(**initialization_kwargs)
+
+    def on_mount(self) -> None:
+        # Screens are built right before their first push, so this spans compose and mount.
+        self.interface.metrics.histogram(f"compose.{self.id}").record(time.perf_counter_ns() - self.created_at)
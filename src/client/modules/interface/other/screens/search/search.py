@@ -0,0 +1,70 @@
+from typing import Any, Optional
+
+from textual import work
+from textual.binding import Binding
+from textual.containers import Center, Middle, Vertical
+from textual.markup import escape
+from textual.widgets import Input, Label, ListItem, ListView
+from textual.worker import get_current_worker
+
+from ..screen import Screen
+
+
+class Search(Screen):
+    BINDINGS = [Binding("escape", "close", "Close")]
+
+    def __init__(self, interface_instance: Any, **initialization_kwargs: Any) -> None:
+        super().__init__(interface_instance, **initialization_kwargs)
+        self.search_timer: Optional[Any] = None
+
+    def compose(self):
+        with Center():
+            with Middle():
+                with Vertical(id="modal-panel"):
+                    yield Label("SEARCH HISTORY", classes="title")
+                    yield Input(placeholder="Commands, paths, identifiers...", id="search_query")
+                    yield Label("", id="search_status")
+                    yield ListView(id="search_results")
+
+    def on_mount(self) -> None:
+        self.query_one("#search_query", Input).focus()
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        if event.input.id == "search_query":
+            if self.search_timer:
+                self.search_timer.stop()
+            self.search_timer = self.set_timer(0.2, self.run_search)
+
+    def run_search(self) -> None:
+        query_value: str = self.query_one("#search_query", Input).value.strip()
+        index_module: Optional[Any] = self.interface.client.get_module("index")
+        if not query_value or not index_module:
+            self.show_results(query_value, [])
+            return
+        self.lookup(index_module, query_value)
+
+    @work(exclusive=True, thread=True, group="search")
+    def lookup(self, index_module: Any, query_value: str) -> None:
+        results: list[Any] = index_module.search(query_value)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self.show_results, query_value, results)
+
+    def show_results(self, query_value: str, results: list[Any]) -> None:
+        if self.query_one("#search_query", Input).value.strip() != query_value:
+            return
+
+        result_list: ListView = self.query_one("#search_results", ListView)
+        result_list.clear()
+        for result in results:
+            message: Any = result["message"]
+            body: str = str(message.get("body", "")) if isinstance(message, dict) else str(message)
+            sender: str = str(message.get("sender", "")) if isinstance(message, dict) else ""
+            first_line: str = body.splitlines()[0] if body else ""
+            # Peer text is escaped so brackets in paths or code are shown rather than parsed as markup.
+            result_list.append(ListItem(Label(f"[dim]#{escape(str(result['room']))}[/] [b]{escape(sender)}[/] {escape(first_line)}", markup=True)))
+
+        status: str = f"{len(results)} result(s)" if query_value else ""
+        self.query_one("#search_status", Label).update(status)
+
+    def action_close(self) -> None:
+        self.app.pop_screen()
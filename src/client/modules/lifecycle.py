@@ -0,0 +1,44 @@
+import inspect
+from typing import Any
+
+from .registry import Registry
+
+# Targets are relative to the src.client package, where both Client and Headless build their registry.
+MODULES: tuple[tuple[str, str, bool], ...] = (
+    ("profile", ".modules.profile.profile:Profile", True),
+    ("network", ".modules.network.network:Network", False),
+    ("graph", ".modules.graph.graph:Graph", False),
+    ("history", ".modules.history.history:History", True),
+    ("share", ".modules.share.share:Share", True),
+    ("discovery", ".modules.discovery.discovery:Discovery", False),
+    ("outbox", ".modules.outbox.outbox:Outbox", True),
+    ("presence", ".modules.presence.presence:Presence", False),
+    ("index", ".modules.index.index:Index", True),
+)
+
+# Whatever still talks to peers stops before the storage it writes into is closed.
+SHUTDOWN: tuple[tuple[str, str], ...] = (
+    ("discovery", "stop"),
+    ("presence", "stop"),
+    ("network", "stop"),
+    ("index", "close"),
+    ("history", "close"),
+    ("outbox", "close"),
+)
+
+
+def register(modules: Registry, owner: Any, directory: Any) -> None:
+    for name, target, stored in MODULES:
+        if stored:
+            modules.register(name, target, owner, directory)
+        else:
+            modules.register(name, target, owner)
+
+
+async def shutdown(modules: Registry) -> None:
+    for name, method in SHUTDOWN:
+        module = modules.peek(name)
+        if module:
+            result = getattr(module, method)()
+            if inspect.isawaitable(result):
+                await result
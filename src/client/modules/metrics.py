@@ -0,0 +1,181 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+
+class Null:
+    def counter(self, name: str) -> "Null":
+        return self
+
+    def gauge(self, name: str) -> "Null":
+        return self
+
+    def histogram(self, name: str) -> "Null":
+        return self
+
+    def scope(self, prefix: str) -> "Null":
+        return self
+
+    def inc(self, amount: int = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def record(self, nanoseconds: int) -> None:
+        pass
+
+    def time(self) -> "Null":
+        return self
+
+    def __enter__(self) -> "Null":
+        return self
+
+    def __exit__(self, *exception: Any) -> None:
+        pass
+
+
+NULL = Null()
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value: int = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value: float = 0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Timer:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram: "Histogram") -> None:
+        self.histogram = histogram
+        self.started: int = 0
+
+    def __enter__(self) -> "Timer":
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exception: Any) -> None:
+        self.histogram.record(time.perf_counter_ns() - self.started)
+
+
+class Histogram:
+    __slots__ = ("buckets", "count", "total", "maximum")
+
+    def __init__(self) -> None:
+        # Bucket n holds samples below 2**n nanoseconds.
+        self.buckets: list[int] = [0] * 64
+        self.count: int = 0
+        self.total: int = 0
+        self.maximum: int = 0
+
+    def record(self, nanoseconds: int) -> None:
+        self.buckets[min(nanoseconds.bit_length(), 63)] += 1
+        self.count += 1
+        self.total += nanoseconds
+        if nanoseconds > self.maximum:
+            self.maximum = nanoseconds
+
+    def time(self) -> Timer:
+        return Timer(self)
+
+    def percentile(self, fraction: float) -> int:
+        target: float = fraction * self.count
+        seen: int = 0
+        for bucket, samples in enumerate(self.buckets):
+            seen += samples
+            if samples and seen >= target:
+                return min(1 << bucket, self.maximum)
+        return self.maximum
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count / 1000 if self.count else 0.0,
+            "p50_us": self.percentile(0.5) / 1000,
+            "p99_us": self.percentile(0.99) / 1000,
+            "max_us": self.maximum / 1000,
+        }
+
+
+class Scope:
+    def __init__(self, metrics: "Metrics", prefix: str) -> None:
+        self.metrics = metrics
+        self.prefix = prefix
+
+    def counter(self, name: str) -> Any:
+        return self.metrics.counter(f"{self.prefix}.{name}")
+
+    def gauge(self, name: str) -> Any:
+        return self.metrics.gauge(f"{self.prefix}.{name}")
+
+    def histogram(self, name: str) -> Any:
+        return self.metrics.histogram(f"{self.prefix}.{name}")
+
+
+class Metrics:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled: bool = enabled
+        self.counters: dict[str, Counter] = {}
+        self.gauges: dict[str, Gauge] = {}
+        self.histograms: dict[str, Histogram] = {}
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def scope(self, prefix: str) -> Any:
+        return Scope(self, prefix) if self.enabled else NULL
+
+    def counter(self, name: str) -> Any:
+        if not self.enabled:
+            return NULL
+        return self.counters.setdefault(name, Counter())
+
+    def gauge(self, name: str) -> Any:
+        if not self.enabled:
+            return NULL
+        return self.gauges.setdefault(name, Gauge())
+
+    def histogram(self, name: str) -> Any:
+        if not self.enabled:
+            return NULL
+        return self.histograms.setdefault(name, Histogram())
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "counters": {name: counter.value for name, counter in sorted(self.counters.items())},
+            "gauges": {name: gauge.value for name, gauge in sorted(self.gauges.items())},
+            "histograms": {name: histogram.summary() for name, histogram in sorted(self.histograms.items())},
+        }
+
+    def dump(self, path: Path) -> None:
+        temporary: Path = path.with_suffix(".tmp")
+        with open(temporary, "w") as writer:
+            json.dump(self.snapshot(), writer, indent=4)
+        os.replace(temporary, path)
+
+
+metrics: Metrics = Metrics(enabled=os.environ.get("SHH_METRICS") == "1")
+
+
+def load(path: Path) -> Optional[dict[str, Any]]:
+    if not path.exists():
+        return None
+    with open(path, "r") as reader:
+        return json.load(reader)
@@ -0,0 +1,82 @@
+import sys
+from typing import Any
+
+
+class Names:
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+        self.names: list[str] = []
+
+    def id(self, name: str) -> int:
+        identifier = self.ids.get(name)
+        if identifier is None:
+            name = sys.intern(name)
+            identifier = len(self.names)
+            self.ids[name] = identifier
+            self.names.append(name)
+        return identifier
+
+    def intern(self, name: str) -> str:
+        return self.names[self.id(name)]
+
+    def name(self, identifier: int) -> str:
+        return self.names[identifier]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+# Usernames repeat across every room, peer table and message window, so one table serves them all.
+names = Names()
+
+
+class Peer:
+    __slots__ = ("name", "host", "port", "rooms", "seen")
+
+    def __init__(self, name: str, host: str = "", port: int = 0, rooms: tuple = (), seen: float = 0.0) -> None:
+        self.name = names.intern(name)
+        self.host = sys.intern(host)
+        self.port = port
+        self.rooms = tuple(sys.intern(room) for room in rooms)
+        self.seen = seen
+
+    def pack(self) -> list:
+        return [self.name, self.host, self.port, list(self.rooms), self.seen]
+
+    @classmethod
+    def unpack(cls, data: list) -> "Peer":
+        return cls(*data)
+
+
+class Message:
+    __slots__ = ("id", "room", "sender", "time", "body")
+
+    def __init__(self, id: str, room: str, sender: str, time: float, body: str) -> None:
+        self.id = id
+        self.room = sys.intern(room)
+        self.sender = names.intern(sender)
+        self.time = time
+        self.body = body
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "Message":
+        if not isinstance(data, dict):
+            return cls("", "", "", 0.0, str(data))
+        return cls(
+            str(data.get("id", "")),
+            str(data.get("room", "")),
+            str(data.get("sender", data.get("origin", ""))),
+            float(data.get("time", 0.0)),
+            str(data.get("body", "")),
+        )
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "room": self.room, "sender": self.sender, "time": self.time, "body": self.body}
+
+    def pack(self) -> list:
+        return [self.id, self.room, self.sender, self.time, self.body]
+
+    @classmethod
+    def unpack(cls, data: list) -> "Message":
+        return cls(*data)
+
@@ -0,0 +1,94 @@
+from array import array
+from typing import Any, Iterable, Iterator
+
+from ..model import Message, names
+
+
+class Window:
+    __slots__ = ("first", "room", "times", "senders", "offsets", "bodies")
+
+    # One contiguous run of a room's messages, stored column-wise: no per-message objects,
+    # just parallel arrays and a single UTF-8 buffer that every body slices out of.
+    def __init__(self, first: int = 0, room: str = "") -> None:
+        self.first = first
+        self.room = room
+        self.times = array("d")
+        self.senders = array("I")
+        self.offsets = array("I", [0])
+        self.bodies = bytearray()
+
+    @classmethod
+    def from_messages(cls, first: int, messages: Iterable[Any], room: str = "") -> "Window":
+        window = cls(first, room)
+        for message in messages:
+            window.append(message)
+        return window
+
+    def append(self, message: Any) -> int:
+        if isinstance(message, Message):
+            sender, body, time = message.sender, message.body, message.time
+        elif isinstance(message, dict):
+            sender = str(message.get("sender", message.get("origin", "")))
+            body, time = str(message.get("body", "")), float(message.get("time", 0.0))
+        else:
+            sender, body, time = "", str(message), 0.0
+        self.times.append(time)
+        self.senders.append(names.id(sender))
+        self.bodies += body.encode()
+        self.offsets.append(len(self.bodies))
+        return self.first + len(self.times) - 1
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def sender(self, position: int) -> str:
+        return names.name(self.senders[position])
+
+    def body(self, position: int) -> str:
+        return self.bodies[self.offsets[position]:self.offsets[position + 1]].decode()
+
+    def time(self, position: int) -> float:
+        return self.times[position]
+
+    def offset(self, position: int) -> int:
+        return self.first + position
+
+    def __getitem__(self, position: int) -> Message:
+        if position < 0:
+            position += len(self)
+        return Message("", self.room, self.sender(position), self.times[position], self.body(position))
+
+    def __iter__(self) -> Iterator[Message]:
+        return (self[position] for position in range(len(self)))
+
+    def rows(self, start: int = 0, stop: int = -1) -> Iterator[tuple[str, str]]:
+        stop = len(self) if stop < 0 else min(stop, len(self))
+        for position in range(max(start, 0), stop):
+            yield self.sender(position), self.body(position)
+
+    def pack(self) -> dict:
+        # Sender ids are local to this process, so the window ships its own small name table.
+        local: dict[int, int] = {}
+        senders = array("I", (local.setdefault(sender, len(local)) for sender in self.senders))
+        return {
+            "first": self.first,
+            "room": self.room,
+            "names": [names.name(sender) for sender in local],
+            "times": self.times.tobytes(),
+            "senders": senders.tobytes(),
+            "offsets": self.offsets.tobytes(),
+            "bodies": bytes(self.bodies),
+        }
+
+    @classmethod
+    def unpack(cls, data: dict) -> "Window":
+        window = cls(data["first"], data["room"])
+        table = [names.id(name) for name in data["names"]]
+        window.times.frombytes(data["times"])
+        senders = array("I")
+        senders.frombytes(data["senders"])
+        window.senders = array("I", (table[sender] for sender in senders))
+        window.offsets = array("I")
+        window.offsets.frombytes(data["offsets"])
+        window.bodies = bytearray(data["bodies"])
+        return window
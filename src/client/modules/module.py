@@ -1,7 +1,10 @@
 from typing import Any
 
+from .metrics import metrics
+
 
 class Module:
     def __init__(self, module_name: str, client_instance: Any) -> None:
         self.client: Any = client_instance
-        self.name: str = module_name
\ No newline at end of file
+        self.name: str = module_name
+        self.metrics: Any = metrics.scope(module_name.lower())
@@ -1,5 +1,108 @@
+import asyncio
+
+import aiohttp
+
 from ..module import Module
+from .other.connection import Connection
+from .other.relay import RelayConnection
 
 class Network(Module):
-    def __init__(self, parent):
-        super().__init__("Network", parent)
\ No newline at end of file
+    def __init__(self, parent, limit=1024):
+        super().__init__("Network", parent)
+        self.limit = limit
+        self.connections = {}
+        self.addresses = {}
+        self.accepted = set()
+        self.connecting = {}
+        self.handlers = {}
+        self.piggybackers = []
+        self.server = None
+        self.session = None
+        self.encoding = self.metrics.histogram("frame.encode")
+        self.decoding = self.metrics.histogram("frame.decode")
+        self.received = self.metrics.counter("messages.received")
+        self.sent = self.metrics.counter("messages.sent")
+        self.dropped = self.metrics.counter("messages.dropped")
+
+    def on(self, kind, handler):
+        self.handlers.setdefault(kind, []).append(handler)
+
+    def dispatch(self, connection, message):
+        self.received.inc()
+        kind = message.get("type") if isinstance(message, dict) else None
+        for handler in self.handlers.get(kind, ()):
+            handler(connection, message)
+
+    def piggyback(self, connection):
+        extra = []
+        for piggybacker in self.piggybackers:
+            extra.extend(piggybacker(connection))
+        return extra
+
+    async def listen(self, host="127.0.0.1", port=0, sock=None):
+        if sock is not None:
+            self.server = await asyncio.start_server(self.accept, sock=sock)
+        else:
+            self.server = await asyncio.start_server(self.accept, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def accept(self, reader, writer):
+        connection = Connection(self, reader, writer, writer.get_extra_info("peername"), self.limit)
+        self.accepted.add(connection)
+        connection.start()
+
+    async def connect(self, host, port):
+        peer = (host, port)
+        connection = self.connections.get(peer)
+        if connection and not connection.closed:
+            return connection
+
+        # Concurrent callers for the same peer share one dial.
+        pending = self.connecting.get(peer)
+        if pending is None:
+            pending = asyncio.ensure_future(asyncio.open_connection(host, port))
+            self.connecting[peer] = pending
+        try:
+            reader, writer = await pending
+        finally:
+            self.connecting.pop(peer, None)
+
+        connection = self.connections.get(peer)
+        if connection and not connection.closed:
+            return connection
+        connection = Connection(self, reader, writer, peer, self.limit)
+        self.connections[peer] = connection
+        connection.start()
+        return connection
+
+    async def relay(self, url):
+        connection = self.connections.get(url)
+        if connection and not connection.closed:
+            return connection
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        connection = RelayConnection(self, url, self.limit)
+        await connection.open(self.session)
+        self.connections[url] = connection
+        return connection
+
+    async def send(self, host, port, message):
+        connection = await self.connect(host, port)
+        await connection.send(message)
+
+    def forget(self, connection):
+        self.accepted.discard(connection)
+        if self.connections.get(connection.peer) is connection:
+            del self.connections[connection.peer]
+
+    async def stop(self):
+        server, self.server = self.server, None
+        if server:
+            server.close()
+        for connection in list(self.connections.values()) + list(self.accepted):
+            await connection.close()
+        if server:
+            await server.wait_closed()
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
@@ -0,0 +1,90 @@
+import asyncio
+
+import msgpack
+
+from .frame import Decoder, Encoder
+
+class Connection:
+    def __init__(self, network, reader, writer, peer, limit=1024, batch=256):
+        self.network = network
+        self.reader = reader
+        self.writer = writer
+        self.peer = peer
+        self.batch = batch
+        self.queue = asyncio.Queue(limit)
+        self.encoder = Encoder()
+        self.decoder = Decoder()
+        self.tasks = []
+        self.closed = False
+
+    def start(self):
+        self.tasks = [
+            asyncio.create_task(self.read_loop()),
+            asyncio.create_task(self.write_loop()),
+        ]
+
+    async def send(self, message):
+        if self.closed:
+            raise ConnectionError(f"Connection to {self.peer} is closed")
+        await self.queue.put(message)
+
+    def send_nowait(self, message):
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def read_loop(self):
+        try:
+            while True:
+                data = await self.reader.read(65536)
+                if not data:
+                    break
+                with self.network.decoding.time():
+                    messages = self.decoder.feed(data)
+                self.network.dropped.inc(self.decoder.dropped)
+                for message in messages:
+                    self.network.dispatch(self, message)
+        except (ConnectionError, ValueError, msgpack.UnpackException):
+            pass
+        finally:
+            await self.close()
+
+    async def write_loop(self):
+        try:
+            while True:
+                batch = [await self.queue.get()]
+                while len(batch) < self.batch and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                batch.extend(self.network.piggyback(self))
+                with self.network.encoding.time():
+                    frames = self.encoder.encode(batch)
+                self.network.dropped.inc(self.encoder.dropped)
+                self.network.sent.inc(len(batch) - self.encoder.dropped)
+                if frames:
+                    self.writer.write(frames)
+                    await self.writer.drain()
+        except Exception:
+            # A dead writer must not leave the connection looking open with a queue nobody drains.
+            await self.close()
+
+    async def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        # Frees the slots that senders blocked on a full queue are waiting for.
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        current = asyncio.current_task()
+        for task in self.tasks:
+            if task is not current:
+                task.cancel()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        self.network.forget(self)
@@ -0,0 +1,61 @@
+import struct
+
+import msgpack
+
+HEADER = struct.Struct(">I")
+
+class Encoder:
+    def __init__(self):
+        self.packer = msgpack.Packer(autoreset=False)
+        self.header = bytearray(HEADER.size)
+        self.dropped = 0
+
+    def encode(self, messages):
+        output = bytearray()
+        packer = self.packer
+        self.dropped = 0
+        for message in messages:
+            try:
+                packer.pack(message)
+            except (TypeError, ValueError, OverflowError):
+                # One unencodable message is dropped; the rest of the batch still goes out.
+                packer.reset()
+                self.dropped += 1
+                continue
+            payload = packer.getbuffer()
+            HEADER.pack_into(self.header, 0, payload.nbytes)
+            output += self.header
+            output += payload
+            payload.release()
+            packer.reset()
+        return output
+
+class Decoder:
+    def __init__(self, limit=16 * 1024 * 1024):
+        self.limit = limit
+        self.buffer = bytearray()
+        self.dropped = 0
+
+    def feed(self, data):
+        buffer = self.buffer
+        buffer += data
+        messages = []
+        consumed = 0
+        self.dropped = 0
+        with memoryview(buffer) as view:
+            while len(buffer) - consumed >= HEADER.size:
+                (length,) = HEADER.unpack_from(view, consumed)
+                if length > self.limit:
+                    raise ValueError(f"Frame of {length} bytes exceeds limit of {self.limit}")
+                end = consumed + HEADER.size + length
+                if end > len(buffer):
+                    break
+                # Each frame decodes on its own; an undecodable one is dropped and the next starts clean.
+                try:
+                    messages.append(msgpack.unpackb(view[consumed + HEADER.size:end], raw=False))
+                except (ValueError, msgpack.UnpackException):
+                    self.dropped += 1
+                consumed = end
+        if consumed:
+            del buffer[:consumed]
+        return messages
@@ -0,0 +1,92 @@
+import asyncio
+
+import aiohttp
+import msgpack
+
+class RelayConnection:
+    def __init__(self, network, url, limit=1024, batch=256):
+        self.network = network
+        self.peer = url
+        self.batch = batch
+        self.queue = asyncio.Queue(limit)
+        self.packer = msgpack.Packer()
+        self.websocket = None
+        self.tasks = []
+        self.closed = False
+
+    async def open(self, session):
+        self.websocket = await session.ws_connect(self.peer, max_msg_size=16 * 1024 * 1024)
+        self.tasks = [
+            asyncio.create_task(self.read_loop()),
+            asyncio.create_task(self.write_loop()),
+        ]
+
+    async def send(self, message):
+        if self.closed:
+            raise ConnectionError(f"Connection to {self.peer} is closed")
+        await self.queue.put(message)
+
+    def send_nowait(self, message):
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def read_loop(self):
+        try:
+            async for frame in self.websocket:
+                if frame.type != aiohttp.WSMsgType.BINARY:
+                    continue
+                with self.network.decoding.time():
+                    # Every websocket frame holds whole messages, so a torn one cannot bleed into the next frame.
+                    unpacker = msgpack.Unpacker(raw=False, max_buffer_size=16 * 1024 * 1024)
+                    unpacker.feed(frame.data)
+                    messages = []
+                    try:
+                        messages.extend(unpacker)
+                    except (ValueError, msgpack.UnpackException):
+                        self.network.dropped.inc()
+                for message in messages:
+                    self.network.dispatch(self, message)
+        finally:
+            await self.close()
+
+    async def write_loop(self):
+        try:
+            while True:
+                batch = [await self.queue.get()]
+                while len(batch) < self.batch and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                batch.extend(self.network.piggyback(self))
+                with self.network.encoding.time():
+                    frames = bytearray()
+                    for message in batch:
+                        try:
+                            frames += self.packer.pack(message)
+                        except (TypeError, ValueError, OverflowError):
+                            self.packer.reset()
+                            self.network.dropped.inc()
+                            continue
+                        self.network.sent.inc()
+                if frames:
+                    await self.websocket.send_bytes(bytes(frames))
+        except Exception:
+            await self.close()
+
+    async def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        # Frees the slots that senders blocked on a full queue are waiting for.
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        current = asyncio.current_task()
+        for task in self.tasks:
+            if task is not current:
+                task.cancel()
+        if self.websocket is not None:
+            await self.websocket.close()
+        self.network.forget(self)
@@ -0,0 +1,192 @@
+import asyncio
+import os
+import random
+from collections import deque
+from pathlib import Path
+from urllib.parse import quote
+
+import msgpack
+
+from ..module import Module
+
+class Outbox(Module):
+    def __init__(self, client, directory, batch_count=256, batch_bytes=256 * 1024, linger=0.05, timeout=10.0, spread=2.0):
+        super().__init__("Outbox", client)
+        self.directory = Path(directory) / ".shh" / "outbox"
+        self.batch_count = batch_count
+        self.batch_bytes = batch_bytes
+        self.linger = linger
+        self.timeout = timeout
+        self.spread = spread
+        self.owner = None
+        self.path = None
+        self.file = None
+        self.queues = {}
+        self.sequence = 0
+        self.acked = 0
+        self.buffer = bytearray()
+        self.flush_handle = None
+        self.waiting = {}
+        self.delivered = {}
+        self.flushing = set()
+        self.attached = None
+        self.writes = self.metrics.counter("writes")
+        self.batches = self.metrics.counter("batches")
+
+    def open(self, owner):
+        self.close()
+        self.owner = owner
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"{quote(owner, safe='')}.log"
+        self.queues = {}
+        self.sequence = 0
+        self.acked = 0
+        if self.path.exists():
+            end = 0
+            with open(self.path, "rb") as reader:
+                unpacker = msgpack.Unpacker(reader, raw=False)
+                try:
+                    for record in unpacker:
+                        self.replay(record)
+                        end = unpacker.tell()
+                except (msgpack.UnpackException, ValueError, TypeError, IndexError):
+                    pass
+            # A record torn by a crash is cut off, so the next append does not run into it.
+            if end < self.path.stat().st_size:
+                os.truncate(self.path, end)
+        self.file = open(self.path, "ab")
+
+    def replay(self, record):
+        if record[0] == "s":
+            self.sequence = max(self.sequence, record[1])
+        elif record[0] == "m":
+            _, sequence, destination, message = record
+            self.queues.setdefault(destination, deque()).append((sequence, message))
+            self.sequence = max(self.sequence, sequence)
+        elif record[0] == "a":
+            self.truncate(record[1], record[2])
+
+    def truncate(self, destination, last):
+        queue = self.queues.get(destination)
+        while queue and queue[0][0] <= last:
+            queue.popleft()
+            self.acked += 1
+        if queue is not None and not queue:
+            del self.queues[destination]
+
+    def append(self, record):
+        # Records accumulate in memory and reach disk in one write per linger period.
+        self.buffer += msgpack.packb(record)
+        if self.flush_handle is None:
+            try:
+                self.flush_handle = asyncio.get_running_loop().call_later(self.linger, self.sync)
+            except RuntimeError:
+                self.sync()
+
+    def sync(self):
+        self.flush_handle = None
+        if self.buffer and self.file:
+            self.file.write(self.buffer)
+            self.file.flush()
+            self.buffer.clear()
+            self.writes.inc()
+
+    def enqueue(self, destination, message):
+        if self.file is None:
+            profile = self.client.get_module("profile") if self.client else None
+            selected = profile.selected_profile if profile else None
+            self.open(selected["username"] if selected else "default")
+        self.sequence += 1
+        self.queues.setdefault(destination, deque()).append((self.sequence, message))
+        self.append(["m", self.sequence, destination, message])
+        return self.sequence
+
+    def pending(self, destination=None):
+        if destination is not None:
+            return len(self.queues.get(destination, ()))
+        return sum(len(queue) for queue in self.queues.values())
+
+    def attach(self, network):
+        if self.attached is network:
+            return
+        self.attached = network
+        network.on("outbox.batch", self.on_batch)
+        network.on("outbox.ack", self.on_ack)
+
+    async def flush(self, destination, connection, delay=True):
+        if destination in self.flushing:
+            return
+        self.flushing.add(destination)
+        self.attach(connection.network)
+        try:
+            if delay:
+                # Spread reconnect flushes out so a fleet waking together does not stampede.
+                await asyncio.sleep(random.uniform(0, self.spread))
+            while self.queues.get(destination):
+                batch, size = [], 0
+                for sequence, message in self.queues[destination]:
+                    batch.append((sequence, message))
+                    size += len(msgpack.packb(message))
+                    if len(batch) >= self.batch_count or size >= self.batch_bytes:
+                        break
+                last = batch[-1][0]
+                acknowledged = asyncio.get_running_loop().create_future()
+                self.waiting[(destination, last)] = acknowledged
+                await connection.send({"type": "outbox.batch", "origin": self.owner, "destination": destination, "last": last, "messages": [message for _, message in batch], "sequences": [sequence for sequence, _ in batch]})
+                self.batches.inc()
+                try:
+                    await asyncio.wait_for(acknowledged, timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    return
+                finally:
+                    self.waiting.pop((destination, last), None)
+        finally:
+            self.flushing.discard(destination)
+
+    def on_batch(self, connection, message):
+        # One sequence counter is shared by every destination, so delivery is tracked per pair.
+        key = (message.get("origin"), message.get("destination"))
+        previous = self.delivered.get(key, 0)
+        # Replayed batches after a lost ack are dropped up to the last sequence already delivered.
+        for sequence, inner in zip(message["sequences"], message["messages"]):
+            if sequence > previous and isinstance(inner, dict):
+                connection.network.dispatch(connection, inner)
+        self.delivered[key] = max(previous, message["last"])
+        connection.send_nowait({"type": "outbox.ack", "destination": message["destination"], "last": message["last"]})
+
+    def on_ack(self, connection, message):
+        destination, last = message["destination"], message["last"]
+        self.truncate(destination, last)
+        self.append(["a", destination, last])
+        acknowledged = self.waiting.get((destination, last))
+        if acknowledged and not acknowledged.done():
+            acknowledged.set_result(True)
+        self.compact()
+
+    def compact(self):
+        # Rewrite the log once most of it is acknowledged history.
+        if self.acked < 1024 or self.acked < self.pending():
+            return
+        self.sync()
+        temporary = self.path.with_suffix(".tmp")
+        with open(temporary, "wb") as writer:
+            packer = msgpack.Packer()
+            # The high-water mark survives even when every message is acknowledged, so sequences never restart.
+            writer.write(packer.pack(["s", self.sequence]))
+            for destination, queue in self.queues.items():
+                for sequence, message in queue:
+                    writer.write(packer.pack(["m", sequence, destination, message]))
+            writer.flush()
+            os.fsync(writer.fileno())
+        self.file.close()
+        os.replace(temporary, self.path)
+        self.file = open(self.path, "ab")
+        self.acked = 0
+
+    def close(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+        self.sync()
+        if self.file:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,118 @@
+import asyncio
+import time
+import weakref
+
+from ..module import Module
+
+class Presence(Module):
+    def __init__(self, client, tick=0.25, typing_timeout=5.0):
+        super().__init__("Presence", client)
+        self.tick = tick
+        self.typing_timeout = typing_timeout
+        self.identity = None
+        self.state = {"status": "active", "typing": None}
+        self.dirty = set()
+        self.version = 0
+        self.published = 0
+        self.versions = {}
+        self.delivered = weakref.WeakKeyDictionary()
+        self.last_keystroke = 0.0
+        self.remote = {}
+        self.updated = set()
+        self.listeners = []
+        self.network = None
+        self.task = None
+        self.deltas = self.metrics.counter("deltas.sent")
+        self.piggybacked = self.metrics.counter("deltas.piggybacked")
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def start(self, identity, network):
+        self.identity = identity
+        self.network = network
+        profile = self.client.get_module("profile") if self.client else None
+        if profile and profile.selected_profile:
+            self.state["status"] = profile.selected_profile.get("metadata", {}).get("status", "active")
+        # The starting state is published like any change, so the first tick has something to send.
+        self.dirty.update(self.state)
+        network.on("presence", self.on_presence)
+        network.piggybackers.append(self.piggyback)
+        self.task = asyncio.create_task(self.tick_loop())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    def set(self, field, value):
+        if self.state.get(field) != value:
+            self.state[field] = value
+            self.dirty.add(field)
+
+    def set_status(self, status):
+        self.set("status", status)
+
+    def typing(self, room):
+        # Keystrokes only refresh a timestamp; the wire sees at most one change per tick.
+        self.last_keystroke = time.monotonic()
+        self.set("typing", room)
+
+    def publish(self):
+        if self.state["typing"] and time.monotonic() - self.last_keystroke > self.typing_timeout:
+            self.set("typing", None)
+        if self.dirty:
+            self.version += 1
+            for field in self.dirty:
+                self.versions[field] = self.version
+            self.dirty.clear()
+
+    def delta(self, connection):
+        seen = self.delivered.get(connection, 0)
+        if seen >= self.version:
+            return None
+        self.delivered[connection] = self.version
+        # A connection that has seen nothing gets every field, not just the ones changed recently.
+        if seen == 0:
+            changed = dict(self.state)
+        else:
+            changed = {field: self.state[field] for field, version in self.versions.items() if version > seen}
+        return {"type": "presence", "peer": self.identity, "delta": changed}
+
+    def piggyback(self, connection):
+        message = self.delta(connection)
+        if message is None:
+            return []
+        self.piggybacked.inc()
+        return [message]
+
+    async def tick_loop(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            # A delta rides along with regular traffic for one tick; connections that
+            # stayed idle since the previous publish get it as a standalone message.
+            for connection in list(self.network.connections.values()) + list(self.network.accepted):
+                if self.delivered.get(connection, 0) < self.published:
+                    message = self.delta(connection)
+                    if connection.send_nowait(message):
+                        self.deltas.inc()
+                    else:
+                        self.delivered[connection] = 0
+            self.publish()
+            self.published = self.version
+            self.apply()
+
+    def on_presence(self, connection, message):
+        peer = message.get("peer")
+        if peer is None or peer == self.identity:
+            return
+        self.remote.setdefault(peer, {}).update(message.get("delta", {}))
+        self.updated.add(peer)
+
+    def apply(self):
+        if not self.updated:
+            return
+        batch = {peer: dict(self.remote[peer]) for peer in self.updated}
+        self.updated = set()
+        for listener in list(self.listeners):
+            listener(batch)
@@ -0,0 +1,63 @@
+from bisect import bisect_left, insort
+
+class Search:
+    def __init__(self):
+        self.terms = []
+        self.profiles = {}
+
+    @staticmethod
+    def key(username):
+        return username.strip().casefold()
+
+    def add(self, profile):
+        key = self.key(profile["username"])
+        if key in self.profiles:
+            return
+        self.profiles[key] = profile
+        alias = profile.get("social", {}).get("alias", "").strip().casefold()
+        for term in {key, alias} - {""}:
+            insort(self.terms, (term, key))
+
+    def rebuild(self, profiles):
+        self.profiles = {}
+        self.terms = []
+        for profile in profiles:
+            key = self.key(profile["username"])
+            if key not in self.profiles:
+                self.profiles[key] = profile
+                alias = profile.get("social", {}).get("alias", "").strip().casefold()
+                self.terms.extend((term, key) for term in {key, alias} - {""})
+        self.terms.sort()
+
+    def query(self, text, limit=None):
+        text = text.strip().casefold()
+        if not text:
+            return list(self.profiles.values())[:limit]
+
+        found = {}
+        # Prefix hits come straight off the sorted term list.
+        position = bisect_left(self.terms, (text,))
+        while position < len(self.terms) and self.terms[position][0].startswith(text):
+            found.setdefault(self.terms[position][1], None)
+            position += 1
+
+        # Then substring hits, then loose subsequence hits, until the limit is reached.
+        for matcher in (self.contains, self.subsequence):
+            if limit is not None and len(found) >= limit:
+                break
+            for term, key in self.terms:
+                if key not in found and matcher(text, term):
+                    found[key] = None
+                    if limit is not None and len(found) >= limit:
+                        break
+
+        return [self.profiles[key] for key in list(found)[:limit]]
+
+    @staticmethod
+    def contains(text, term):
+        return text in term
+
+    @staticmethod
+    def subsequence(text, term):
+        remaining = iter(term)
+        return all(character in remaining for character in text)
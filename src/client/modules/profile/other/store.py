@@ -0,0 +1,249 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from ...metrics import NULL
+
+class Store:
+    def __init__(self, path, threshold=256, metrics=NULL):
+        self.path = Path(path)
+        self.journal_path = self.path.with_suffix(".journal")
+        self.lock_path = self.path.with_suffix(".lock")
+        self.threshold = threshold
+        self.data = {"profiles": [], "global": {"first_run": True}}
+        self.index = {}
+        self.last_used = None
+        self.pending = 0
+        self.snapshot = None
+        self.journal = None
+        self.offset = 0
+        self.generation = 0
+        self.mutex = threading.RLock()
+        self.lock_file = None
+        self.depth = 0
+        self.exclusive = False
+        self.appends = metrics.counter("journal.appends")
+        self.saves = metrics.histogram("save")
+        self.reloads = metrics.counter("reloads")
+        self.replays = metrics.counter("replays")
+
+    @staticmethod
+    def key(username):
+        return username.strip().casefold()
+
+    @staticmethod
+    def signature(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    @contextmanager
+    def locked(self, exclusive=True):
+        with self.mutex:
+            if self.lock_file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.lock_file = open(self.lock_path, "a")
+            # flock is per open file; nested sections only upgrade, never downgrade.
+            if fcntl is not None and (self.depth == 0 or (exclusive and not self.exclusive)):
+                fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            previous = self.exclusive
+            self.exclusive = self.exclusive or exclusive
+            self.depth += 1
+            try:
+                yield
+            finally:
+                self.depth -= 1
+                if self.depth == 0:
+                    if fcntl is not None:
+                        fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
+                    self.exclusive = False
+                else:
+                    self.exclusive = previous
+
+    def load(self):
+        with self.locked():
+            self.reload()
+            if self.pending or self.snapshot is None:
+                self.compact()
+        return self.data
+
+    def reload(self):
+        if self.path.exists():
+            with open(self.path, "r") as reader:
+                self.snapshot = self.signature(reader.fileno())
+                self.data = json.load(reader)
+        else:
+            self.snapshot = None
+            self.data = {"profiles": [], "global": {"first_run": True}}
+        self.data.setdefault("profiles", [])
+        self.data.setdefault("global", {"first_run": True})
+        self.reindex()
+        self.journal = None
+        self.offset = 0
+        self.pending = self.replay()
+        self.generation += 1
+        self.reloads.inc()
+
+    def reindex(self):
+        # Built aside and swapped in whole: validation threads read the index without the mutex.
+        index = {}
+        last_used = None
+        for profile in self.data["profiles"]:
+            index[self.key(profile["username"])] = profile
+            if profile.get("isLastUsed", False):
+                if last_used:
+                    last_used["isLastUsed"] = False
+                last_used = profile
+        self.index = index
+        self.last_used = last_used
+
+    def refresh(self):
+        # Two stats decide whether anything changed since this process last looked.
+        with self.mutex:
+            snapshot = self.signature(self.path)
+            journal = self.signature(self.journal_path)
+            if snapshot == self.snapshot and self.unchanged(journal):
+                return False
+            with self.locked(exclusive=False):
+                if self.signature(self.path) != self.snapshot:
+                    self.reload()
+                    return True
+                journal = self.signature(self.journal_path)
+                if self.unchanged(journal):
+                    return False
+                if journal is None or (self.journal is not None and journal[0] != self.journal):
+                    self.reload()
+                    return True
+                applied = self.replay()
+                self.pending += applied
+                if applied:
+                    self.generation += 1
+                return applied > 0
+
+    def unchanged(self, journal):
+        if journal is None:
+            return self.journal is None
+        return journal[0] == self.journal and journal[2] == self.offset
+
+    def replay(self):
+        try:
+            reader = open(self.journal_path, "rb")
+        except FileNotFoundError:
+            return 0
+        applied = 0
+        with reader:
+            inode = os.fstat(reader.fileno()).st_ino
+            if inode != self.journal:
+                self.journal, self.offset = inode, 0
+            reader.seek(self.offset)
+            for line in reader:
+                if not line.endswith(b"\n"):
+                    # A torn or still-in-flight trailing line; picked up on the next refresh.
+                    break
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                self.apply(entry)
+                self.offset += len(line)
+                applied += 1
+        self.replays.inc(applied)
+        return applied
+
+    def apply(self, entry):
+        operation = entry.get("op")
+        if operation == "create":
+            profile = entry["profile"]
+            if self.key(profile["username"]) not in self.index:
+                self.data["profiles"].append(profile)
+                self.index[self.key(profile["username"])] = profile
+            self.mark(self.index[self.key(profile["username"])])
+        elif operation == "switch":
+            profile = self.index.get(self.key(entry["username"]))
+            if profile:
+                self.mark(profile)
+        elif operation == "global":
+            self.data["global"][entry["key"]] = entry["value"]
+
+    def mark(self, profile):
+        if self.last_used is not profile:
+            if self.last_used:
+                self.last_used["isLastUsed"] = False
+            profile["isLastUsed"] = True
+            self.last_used = profile
+
+    def record(self, entry):
+        # Callers hold the exclusive lock and have refreshed, so the journal ends at self.offset.
+        self.apply(entry)
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode()
+        with open(self.journal_path, "ab") as writer:
+            writer.write(line)
+            writer.flush()
+            stat = os.fstat(writer.fileno())
+        self.journal, self.offset = stat.st_ino, stat.st_size
+        self.generation += 1
+        self.appends.inc()
+        self.pending += 1
+        if self.pending >= self.threshold:
+            self.compact()
+
+    def get(self, username):
+        return self.index.get(self.key(username))
+
+    def exists(self, username):
+        return self.key(username) in self.index
+
+    def create(self, profile):
+        with self.locked():
+            self.refresh()
+            if self.exists(profile["username"]):
+                return False
+            self.record({"op": "create", "profile": profile})
+            return True
+
+    def switch(self, username):
+        with self.locked():
+            self.refresh()
+            profile = self.get(username)
+            if not profile:
+                return None
+            if self.last_used is not profile:
+                self.record({"op": "switch", "username": profile["username"]})
+            return profile
+
+    def set_global(self, key, value):
+        with self.locked():
+            self.refresh()
+            if self.data["global"].get(key) != value:
+                self.record({"op": "global", "key": key, "value": value})
+
+    def compact(self):
+        with self.locked(), self.saves.time():
+            temporary = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temporary, "w") as writer:
+                json.dump(self.data, writer, indent=4)
+                writer.flush()
+                os.fsync(writer.fileno())
+            os.replace(temporary, self.path)
+            self.snapshot = self.signature(self.path)
+
+            if self.journal_path.exists():
+                self.journal_path.unlink()
+            self.journal = None
+            self.offset = 0
+            self.pending = 0
+
+    def close(self):
+        with self.mutex:
+            if self.lock_file is not None:
+                self.lock_file.close()
+                self.lock_file = None
@@ -0,0 +1,59 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+
+import coolname
+
+class Suggestions:
+    def __init__(self, store, ttl=30.0, capacity=256, batch=16, attempts=4):
+        self.store = store
+        self.ttl = ttl
+        self.capacity = capacity
+        self.batch = batch
+        self.attempts = attempts
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def check(self, username):
+        key = self.store.key(username)
+        now = time.monotonic()
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None and cached[0] > now:
+                self.cache.move_to_end(key)
+                return cached[1]
+
+        exists = self.store.exists(username)
+        result = (exists, self.suggest(username) if exists else "")
+        with self.lock:
+            self.cache[key] = (now + self.ttl, result)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+        return result
+
+    def candidates(self, base):
+        pool = []
+        for _ in range(self.batch):
+            cool = coolname.generate_slug(2) # type: ignore
+            word = cool.split('-')[0]
+            pool.append(random.choice([f"{base}_{word}", f"{word}.{base}", f"{base}-{random.randint(10, 99)}", cool]))
+        return pool
+
+    def suggest(self, username):
+        base = username.lower().strip()
+        # Work per request is bounded: a few random pools, then a short numbered sweep.
+        for _ in range(self.attempts):
+            available = [candidate for candidate in self.candidates(base) if not self.store.exists(candidate)]
+            if available:
+                return random.choice(available)
+        for number in range(100, 100 + self.batch * self.attempts):
+            candidate = f"{base}-{number}"
+            if not self.store.exists(candidate):
+                return candidate
+        return ""
+
+    def invalidate(self):
+        with self.lock:
+            self.cache.clear()
@@ -1,65 +1,86 @@
-import json
-import random
 from pathlib import Path
 from datetime import datetime
-import coolname
 from ..module import Module
+from .other.search import Search
+from .other.store import Store
+from .other.suggestion import Suggestions
 
 class Profile(Module):
     def __init__(self, client, directory):
         super().__init__("Profile", client)
         self.directory = Path(directory)
         self.path = self.directory / ".shh" / "userdata.json"
+        self.store = Store(self.path, metrics=self.metrics)
+        self.search = Search()
+        self.suggestions = Suggestions(self.store)
+        self.listeners = []
         self.data = self.load()
         self.selected_profile = None
 
     def load(self):
-        default = {"profiles": [], "global": {"first_run": True}}
-        if not self.path.exists():
-            self.path.parent.mkdir(parents=True, exist_ok=True)
-            self.save(default)
-            return default
-        with open(self.path, "r") as reader:
-            return json.load(reader)
+        data = self.store.load()
+        self.generation = self.store.generation
+        self.search.rebuild(data["profiles"])
+        return data
+
+    def refresh(self):
+        self.store.refresh()
+        if self.store.generation == self.generation:
+            return False
+        # Another process changed userdata; derived state follows the store.
+        self.generation = self.store.generation
+        self.data = self.store.data
+        self.search.rebuild(self.data["profiles"])
+        self.suggestions.invalidate()
+        self.notify("reload", None)
+        return True
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def notify(self, event, profile):
+        for listener in list(self.listeners):
+            listener(event, profile)
 
     def save(self, data=None):
-        target_data = data if data else self.data
-        with open(self.path, "w") as writer:
-            json.dump(target_data, writer, indent=4)
+        with self.store.locked():
+            if data:
+                self.store.data = data
+                self.store.reindex()
+            else:
+                self.store.refresh()
+            self.store.compact()
+        self.generation = self.store.generation
+        self.data = self.store.data
+        self.search.rebuild(self.data["profiles"])
 
     def switch_profile(self, username):
-        found = False
-        for profile in self.data["profiles"]:
-            if profile["username"].lower() == username.lower().strip():
-                profile["isLastUsed"] = True
-                self.selected_profile = profile
-                found = True
-            else:
-                profile["isLastUsed"] = False
-        
-        if found:
-            self.save()
-        return found
+        with self.store.locked():
+            self.refresh()
+            profile = self.store.switch(username)
+            self.generation = self.store.generation
+        if profile:
+            self.selected_profile = profile
+            self.notify("switch", profile)
+        return profile is not None
 
     def exists(self, username):
-        return any(p["username"].lower() == username.lower().strip() for p in self.data["profiles"])
+        self.refresh()
+        return self.store.exists(username)
 
     def suggest_username(self, username):
-        base = username.lower().strip()
-        while True:
-            cool = coolname.generate_slug(2) # type: ignore
-            word = cool.split('-')[0]
-            strategies = [f"{base}_{word}", f"{word}.{base}", f"{base}-{random.randint(10, 99)}", f"{cool}"]
-            suggestion = random.choice(strategies)
-            if not self.exists(suggestion):
-                return suggestion
+        return self.suggestions.suggest(username)
+
+    def check_username(self, username):
+        return self.suggestions.check(username)
 
     def create_profile(self, username, alias):
         if self.exists(username):
             return False
-        
-        for profile in self.data["profiles"]:
-            profile["isLastUsed"] = False
 
         new_profile = {
             "index": len(self.data["profiles"]) + 1,
@@ -71,8 +92,16 @@ class Profile(Module):
                 "verified": False
             }
         }
-        self.data["profiles"].append(new_profile)
-        self.data["global"]["first_run"] = False
-        self.selected_profile = new_profile
-        self.save()
+        # Nothing else can write between the refresh and our own records while the lock is held.
+        with self.store.locked():
+            if self.exists(username):
+                return False
+            new_profile["index"] = len(self.data["profiles"]) + 1
+            self.store.create(new_profile)
+            self.store.set_global("first_run", False)
+            self.generation = self.store.generation
+        self.selected_profile = self.store.get(username)
+        self.search.add(self.selected_profile)
+        self.suggestions.invalidate()
+        self.notify("create", self.selected_profile)
         return True
\ No newline at end of file
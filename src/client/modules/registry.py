@@ -0,0 +1,43 @@
+import importlib
+from typing import Any, Optional
+
+
+class Registry:
+    def __init__(self, package: str) -> None:
+        self.package: str = package
+        self.factories: dict[str, tuple[str, tuple, dict]] = {}
+        self.instances: dict[str, Any] = {}
+
+    def register(self, name: str, target: str, *arguments: Any, **keyword_arguments: Any) -> None:
+        self.factories[name.lower()] = (target, arguments, keyword_arguments)
+        self.instances.pop(name.lower(), None)
+
+    def resolve(self, name: str) -> Any:
+        module_path, class_name = self.factories[name][0].split(":")
+        return getattr(importlib.import_module(module_path, self.package), class_name)
+
+    def build(self, name: str) -> Any:
+        _, arguments, keyword_arguments = self.factories[name]
+        return self.resolve(name)(*arguments, **keyword_arguments)
+
+    def preload(self) -> list[Any]:
+        return [self.resolve(name) for name in self.factories]
+
+    def get(self, name: str) -> Optional[Any]:
+        name = name.lower()
+        instance = self.instances.get(name)
+        if instance is None and name in self.factories:
+            instance = self.build(name)
+            self.instances[name] = instance
+        return instance
+
+    def peek(self, name: str) -> Optional[Any]:
+        return self.instances.get(name.lower())
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self.factories
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self:
+            raise KeyError(name)
+        return self.get(name)
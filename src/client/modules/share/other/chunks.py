@@ -0,0 +1,118 @@
+import hashlib
+import os
+import re
+import shutil
+
+import msgpack
+
+DIGEST = re.compile(r"[0-9a-f]{64}")
+
+def valid(digest):
+    # Ids and digests come from peers and become file names, so nothing but 64 hex characters passes.
+    return isinstance(digest, str) and DIGEST.fullmatch(digest) is not None
+
+def identify(digests):
+    return hashlib.sha256("".join(digests).encode()).hexdigest()
+
+class Chunks:
+    def __init__(self, directory, chunk_size=1024 * 1024):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.manifests = directory / "manifests"
+        self.manifests.mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest):
+        if not valid(digest):
+            raise ValueError(f"Invalid chunk digest {digest!r}")
+        return self.directory / digest[:2] / digest
+
+    def has(self, digest):
+        return self.path(digest).exists()
+
+    def put(self, digest, data):
+        if not valid(digest) or hashlib.sha256(data).hexdigest() != digest:
+            return False
+        target = self.path(digest)
+        if target.exists():
+            return True
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temporary = target.with_suffix(".tmp")
+        with open(temporary, "wb") as writer:
+            writer.write(data)
+        os.replace(temporary, target)
+        return True
+
+    def manifest(self, source):
+        # Hash the file a chunk at a time through one reused buffer.
+        buffer = bytearray(self.chunk_size)
+        view = memoryview(buffer)
+        digests = []
+        size = 0
+        with open(source, "rb") as reader:
+            while True:
+                length = reader.readinto(buffer)
+                if not length:
+                    break
+                digests.append(hashlib.sha256(view[:length]).hexdigest())
+                size += length
+        view.release()
+        identifier = identify(digests)
+        return {"id": identifier, "name": os.path.basename(source), "size": size, "chunk_size": self.chunk_size, "chunks": digests}
+
+    def missing(self, manifest):
+        return [digest for digest in dict.fromkeys(manifest["chunks"]) if not self.has(digest)]
+
+    def check(self, manifest):
+        # The id is the hash of the chunk list, so a valid manifest cannot name files it does not describe.
+        try:
+            chunks = manifest["chunks"]
+            return (
+                valid(manifest["id"])
+                and isinstance(chunks, list)
+                and all(valid(digest) for digest in chunks)
+                and manifest["id"] == identify(chunks)
+                and isinstance(manifest["name"], str)
+                and isinstance(manifest["size"], int) and manifest["size"] >= 0
+                and isinstance(manifest["chunk_size"], int) and manifest["chunk_size"] > 0
+            )
+        except (KeyError, TypeError):
+            return False
+
+    def remember(self, manifest):
+        if not valid(manifest["id"]):
+            raise ValueError(f"Invalid manifest id {manifest['id']!r}")
+        with open(self.manifests / manifest["id"], "wb") as writer:
+            writer.write(msgpack.packb(manifest))
+
+    def forget(self, identifier):
+        if valid(identifier):
+            (self.manifests / identifier).unlink(missing_ok=True)
+
+    def pending(self):
+        for path in self.manifests.iterdir():
+            if not valid(path.name):
+                continue
+            with open(path, "rb") as reader:
+                manifest = msgpack.unpackb(reader.read())
+            if self.check(manifest):
+                yield manifest
+
+    def assemble(self, manifest, target):
+        temporary = target.with_name(target.name + ".part")
+        with open(temporary, "wb") as writer:
+            for digest in manifest["chunks"]:
+                with open(self.path(digest), "rb") as reader:
+                    copy(reader, writer)
+        os.replace(temporary, target)
+        return target
+
+def copy(reader, writer):
+    size = os.fstat(reader.fileno()).st_size
+    try:
+        writer.flush()
+        sent = 0
+        while sent < size:
+            sent += os.sendfile(writer.fileno(), reader.fileno(), sent, size - sent)
+    except (AttributeError, OSError):
+        reader.seek(0)
+        shutil.copyfileobj(reader, writer)
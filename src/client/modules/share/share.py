@@ -0,0 +1,149 @@
+import asyncio
+import mmap
+from pathlib import Path
+
+from ..module import Module
+from .other.chunks import Chunks, valid
+
+class Share(Module):
+    def __init__(self, client, directory, window=8, timeout=30.0):
+        super().__init__("Share", client)
+        self.directory = Path(directory) / ".shh"
+        self.downloads = self.directory / "downloads"
+        self.chunks = Chunks(self.directory / "chunks")
+        self.window = window
+        self.timeout = timeout
+        self.outgoing = {}
+        self.incoming = {}
+        self.listeners = []
+        self.bytes_sent = self.metrics.counter("bytes.sent")
+        self.bytes_received = self.metrics.counter("bytes.received")
+        self.attached = None
+        network = client.get_module("network") if client is not None else None
+        if network is not None:
+            self.attach(network)
+
+    def attach(self, network):
+        if self.attached is network:
+            return
+        self.attached = network
+        network.on("share.offer", self.on_offer)
+        network.on("share.want", self.on_want)
+        network.on("share.chunk", self.on_chunk)
+        network.on("share.ack", self.on_ack)
+        network.on("share.done", self.on_done)
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    async def send(self, connection, source):
+        self.attach(connection.network)
+        manifest = await asyncio.get_running_loop().run_in_executor(None, self.chunks.manifest, source)
+        offsets = {}
+        for position, digest in enumerate(manifest["chunks"]):
+            offsets.setdefault(digest, position * manifest["chunk_size"])
+        self.outgoing[manifest["id"]] = {"source": Path(source), "manifest": manifest, "offsets": offsets, "window": None, "done": asyncio.Event()}
+        await connection.send({"type": "share.offer", **manifest})
+        return manifest
+
+    async def wait(self, identifier):
+        transfer = self.outgoing.get(identifier)
+        if transfer:
+            await transfer["done"].wait()
+
+    def on_offer(self, connection, message):
+        manifest = {key: message.get(key) for key in ("id", "name", "size", "chunk_size", "chunks")}
+        if not self.chunks.check(manifest):
+            return
+        self.chunks.remember(manifest)
+        self.request(connection, manifest)
+
+    def request(self, connection, manifest):
+        missing = self.chunks.missing(manifest)
+        self.incoming[manifest["id"]] = {"manifest": manifest, "remaining": set(missing)}
+        if missing:
+            connection.send_nowait({"type": "share.want", "id": manifest["id"], "chunks": missing})
+        else:
+            self.complete(connection, manifest)
+
+    def resume(self, connection):
+        # After a reconnect, ask again for whatever is still missing from unfinished transfers.
+        self.attach(connection.network)
+        for manifest in self.chunks.pending():
+            self.request(connection, manifest)
+
+    def on_want(self, connection, message):
+        transfer = self.outgoing.get(message["id"])
+        if transfer:
+            # A fresh window per request, so a stream stalled on a dead connection cannot starve it.
+            transfer["window"] = asyncio.Semaphore(self.window)
+            asyncio.ensure_future(self.stream(connection, transfer, message["chunks"]))
+
+    async def stream(self, connection, transfer, digests):
+        manifest = transfer["manifest"]
+        window = transfer["window"]
+        with open(transfer["source"], "rb") as reader:
+            if manifest["size"] == 0:
+                return
+            mapping = mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapping)
+            try:
+                for digest in digests:
+                    offset = transfer["offsets"].get(digest)
+                    if offset is None:
+                        continue
+                    # Acks gate the window, so at most a few chunks are ever queued in memory.
+                    await asyncio.wait_for(window.acquire(), timeout=self.timeout)
+                    data = view[offset:offset + manifest["chunk_size"]]
+                    await connection.send({"type": "share.chunk", "id": manifest["id"], "hash": digest, "data": data})
+                    self.bytes_sent.inc(len(data))
+            except (asyncio.TimeoutError, ConnectionError):
+                # A dropped connection ends this stream; the receiver resumes with a new want.
+                pass
+            finally:
+                try:
+                    view.release()
+                    mapping.close()
+                except BufferError:
+                    # Queued chunk views still reference the mapping; it closes once they are dropped.
+                    pass
+
+    def on_chunk(self, connection, message):
+        data = message.get("data")
+        if not valid(message.get("id")) or not valid(message.get("hash")) or not isinstance(data, bytes):
+            return
+        # Only chunks this side asked for are stored or acked; anything else is dropped unseen.
+        transfer = self.incoming.get(message["id"])
+        if transfer is None or message["hash"] not in transfer["remaining"]:
+            return
+        stored = self.chunks.put(message["hash"], data)
+        if stored:
+            self.bytes_received.inc(len(data))
+        connection.send_nowait({"type": "share.ack", "id": message["id"], "hash": message["hash"]})
+        if stored:
+            transfer["remaining"].discard(message["hash"])
+            if not transfer["remaining"]:
+                self.complete(connection, transfer["manifest"])
+
+    def on_ack(self, connection, message):
+        transfer = self.outgoing.get(message["id"])
+        if transfer and transfer["window"] is not None:
+            transfer["window"].release()
+
+    def complete(self, connection, manifest):
+        if self.incoming.pop(manifest["id"], None) is None:
+            return
+        self.downloads.mkdir(parents=True, exist_ok=True)
+        name = Path(manifest["name"]).name
+        if name in ("", ".", ".."):
+            name = manifest["id"]
+        target = self.chunks.assemble(manifest, self.downloads / name)
+        self.chunks.forget(manifest["id"])
+        connection.send_nowait({"type": "share.done", "id": manifest["id"]})
+        for listener in list(self.listeners):
+            listener(manifest, target)
+
+    def on_done(self, connection, message):
+        transfer = self.outgoing.pop(message["id"], None)
+        if transfer:
+            transfer["done"].set()
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+
+from aiohttp import web
+from textual_serve.app_service import AppService
+from textual_serve.server import Server, to_int
+
+from .web import sessions, table
+
+log = logging.getLogger("textual-serve")
+
+class Session:
+    def __init__(self, pid, stdin, stdout, stderr, connection):
+        self.pid = pid
+        self.stdin = stdin
+        self.stdout = stdout
+        self.stderr = stderr
+        self.connection = connection
+
+# Built on textual-serve private internals (_open_app_process, _build_environment, _stdin, _process,
+# _process_messages) as of the version pinned in requiremenets.txt; upgrades need this file re-checked.
+class ZygoteService(AppService):
+    def __init__(self, socket_path, *arguments, **keyword_arguments):
+        super().__init__(*arguments, **keyword_arguments)
+        self.socket_path = socket_path
+
+    async def _open_app_process(self, width=80, height=24):
+        # Instead of spawning a process per browser, the pipes go to the zygote, which forks one.
+        loop = asyncio.get_running_loop()
+        stdin, stdout, stderr = os.pipe(), os.pipe(), os.pipe()
+        remote = [stdin[0], stdout[1], stderr[1]]
+        request = json.dumps({"op": "session", "environ": self._build_environment(width=width, height=height)}).encode() + b"\n"
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(str(self.socket_path))
+            socket.send_fds(connection, [request], remote)
+        except OSError:
+            for fd in (*stdin, *stdout, *stderr):
+                os.close(fd)
+            connection.close()
+            raise
+        for fd in remote:
+            os.close(fd)
+
+        reader, writer = await asyncio.open_unix_connection(sock=connection)
+        reply = json.loads(await reader.readline() or b"{}")
+        if "pid" not in reply:
+            for fd in (stdin[1], stdout[0], stderr[0]):
+                os.close(fd)
+            writer.close()
+            raise RuntimeError(reply.get("error", "zygote closed the session"))
+
+        streams = []
+        for fd in (stdout[0], stderr[0]):
+            stream = asyncio.StreamReader(limit=2 ** 20)
+            await loop.connect_read_pipe(lambda stream=stream: asyncio.StreamReaderProtocol(stream), os.fdopen(fd, "rb", 0))
+            streams.append(stream)
+        transport, protocol = await loop.connect_write_pipe(lambda: asyncio.streams.FlowControlMixin(), os.fdopen(stdin[1], "wb", 0))
+        self._stdin = asyncio.StreamWriter(transport, protocol, None, loop)
+        self._process = Session(reply["pid"], self._stdin, streams[0], streams[1], writer)
+        return self._process
+
+    async def stop(self):
+        await super().stop()
+        if self._process is not None:
+            self._stdin.close()
+            # Dropping the connection tells the zygote to end the session if it is still running.
+            self._process.connection.close()
+            self._process = None
+
+class Gateway(Server):
+    def __init__(self, socket_path, **keyword_arguments):
+        super().__init__("shh", title="shh", **keyword_arguments)
+        self.socket_path = socket_path
+
+    async def _make_app(self):
+        application = await super()._make_app()
+        application.router.add_get("/sessions", self.handle_sessions)
+        return application
+
+    async def handle_sessions(self, request):
+        report = await asyncio.get_running_loop().run_in_executor(None, sessions, self.socket_path)
+        return web.json_response(report)
+
+    async def handle_websocket(self, request):
+        websocket = web.WebSocketResponse(heartbeat=15)
+        width = to_int(request.query.get("width", "80"), 80)
+        height = to_int(request.query.get("height", "24"), 24)
+
+        service = None
+        try:
+            await websocket.prepare(request)
+            service = ZygoteService(
+                self.socket_path,
+                self.command,
+                write_bytes=websocket.send_bytes,
+                write_str=websocket.send_str,
+                close=websocket.close,
+                download_manager=self.download_manager,
+                debug=self.debug,
+            )
+            await service.start(width, height)
+            await self._process_messages(websocket, service)
+        except asyncio.CancelledError:
+            await websocket.close()
+        except RuntimeError as error:
+            log.warning(str(error))
+            await websocket.close()
+        except Exception as error:
+            log.exception(error)
+        finally:
+            if service is not None:
+                await service.stop()
+        return websocket
+
+    async def on_shutdown(self, application):
+        try:
+            print(table(sessions(self.socket_path)), flush=True)
+        except OSError:
+            pass
@@ -0,0 +1,191 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+import msgpack
+from aiohttp import WSMsgType, web
+
+from src.client.modules.network.network import Network
+
+class Session:
+    def __init__(self, relay, websocket, limit):
+        self.relay = relay
+        self.websocket = websocket
+        self.queue = asyncio.Queue(limit)
+        self.rooms = set()
+        self.task = None
+
+    def offer(self, payload):
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.relay.stats["dropped"] += 1
+            return False
+        depth = self.queue.qsize()
+        if depth > self.relay.stats["peak_queue"]:
+            self.relay.stats["peak_queue"] = depth
+        return True
+
+    async def write_loop(self):
+        try:
+            while True:
+                batch = [await self.queue.get()]
+                while len(batch) < 256 and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                # Payloads are self-delimiting msgpack, so a batch goes out as one frame.
+                await self.websocket.send_bytes(b"".join(batch))
+                self.relay.stats["delivered"] += len(batch)
+        except (ConnectionError, RuntimeError):
+            pass
+
+class Relay:
+    def __init__(self, limit=1024, worker=0, siblings=()):
+        self.limit = limit
+        self.worker = worker
+        self.siblings = list(siblings)
+        self.rooms = {}
+        self.bus = Network(None, limit)
+        self.bus.on("relay.publish", self.on_bus_publish)
+        self.started = time.monotonic()
+        self.stats = {"connections": 0, "peak_connections": 0, "received": 0, "delivered": 0, "dropped": 0, "peak_queue": 0}
+
+    def application(self, bus_socket=None):
+        application = web.Application()
+        application.router.add_get("/", self.handle)
+        application["bus_socket"] = bus_socket
+        application.on_startup.append(self.on_startup)
+        application.on_shutdown.append(self.on_shutdown)
+        return application
+
+    async def on_startup(self, application):
+        self.started = time.monotonic()
+        if application["bus_socket"] is not None:
+            await self.bus.listen(sock=application["bus_socket"])
+
+    async def on_shutdown(self, application):
+        await self.bus.stop()
+        print(self.report(), flush=True)
+
+    async def handle(self, request):
+        websocket = web.WebSocketResponse(max_msg_size=16 * 1024 * 1024)
+        await websocket.prepare(request)
+
+        session = Session(self, websocket, self.limit)
+        session.task = asyncio.create_task(session.write_loop())
+        self.stats["connections"] += 1
+        self.stats["peak_connections"] = max(self.stats["peak_connections"], self.stats["connections"])
+
+        unpacker = msgpack.Unpacker(raw=False, max_buffer_size=16 * 1024 * 1024)
+        try:
+            async for frame in websocket:
+                if frame.type != WSMsgType.BINARY:
+                    continue
+                unpacker.feed(frame.data)
+                for message in unpacker:
+                    self.dispatch(session, message)
+        finally:
+            for room in list(session.rooms):
+                self.leave(session, room)
+            session.task.cancel()
+            self.stats["connections"] -= 1
+        return websocket
+
+    def dispatch(self, session, message):
+        if not isinstance(message, dict):
+            return
+        kind = message.get("type")
+        room = message.get("room")
+        if kind == "join" and room:
+            self.rooms.setdefault(room, set()).add(session)
+            session.rooms.add(room)
+        elif kind == "leave" and room:
+            self.leave(session, room)
+        elif room in session.rooms:
+            self.stats["received"] += 1
+            payload = msgpack.packb(message)
+            self.publish(room, payload, session)
+            for port in self.siblings:
+                self.forward(port, {"type": "relay.publish", "room": room, "payload": payload})
+
+    def leave(self, session, room):
+        session.rooms.discard(room)
+        members = self.rooms.get(room)
+        if members is not None:
+            members.discard(session)
+            if not members:
+                del self.rooms[room]
+
+    def publish(self, room, payload, sender=None):
+        for member in self.rooms.get(room, ()):
+            if member is not sender:
+                member.offer(payload)
+
+    def forward(self, port, message):
+        connection = self.bus.connections.get(("127.0.0.1", port))
+        if connection is None or connection.closed:
+            asyncio.create_task(self.dial(port, message))
+        elif not connection.send_nowait(message):
+            self.stats["dropped"] += 1
+
+    async def dial(self, port, message):
+        try:
+            connection = await self.bus.connect("127.0.0.1", port)
+        except OSError:
+            self.stats["dropped"] += 1
+            return
+        if not connection.send_nowait(message):
+            self.stats["dropped"] += 1
+
+    def on_bus_publish(self, connection, message):
+        self.publish(message["room"], message["payload"])
+
+    def report(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        stats = self.stats
+        return (
+            f"[worker {self.worker}] {elapsed:.1f}s, peak {stats['peak_connections']} connections, "
+            f"{stats['received']} received ({stats['received'] / elapsed:.0f}/s), "
+            f"{stats['delivered']} delivered ({stats['delivered'] / elapsed:.0f}/s), "
+            f"{stats['dropped']} dropped, peak queue depth {stats['peak_queue']}"
+        )
+
+def listener(host, port):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    sock.setblocking(False)
+    return sock
+
+def run(sock, limit, worker=0, bus_sockets=()):
+    siblings = [bus.getsockname()[1] for index, bus in enumerate(bus_sockets) if index != worker]
+    relay = Relay(limit, worker, siblings)
+    bus_socket = bus_sockets[worker] if bus_sockets else None
+    web.run_app(relay.application(bus_socket), sock=sock, print=None)
+
+def serve(host="0.0.0.0", port=8765, workers=1, limit=1024):
+    workers = workers or os.cpu_count() or 1
+    sock = listener(host, port)
+    print(f"Relay listening on {host}:{sock.getsockname()[1]} with {workers} worker(s)", flush=True)
+    if workers == 1:
+        run(sock, limit)
+        return
+
+    # Workers inherit the listening socket across fork and accept from it concurrently;
+    # each also gets a loopback bus socket so rooms fan out across shards.
+    bus_sockets = [listener("127.0.0.1", 0) for _ in range(workers)]
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=run, args=(sock, limit, worker, bus_sockets)) for worker in range(workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Workers got the same interrupt; wait for them to drain and report.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        for process in processes:
+            process.join()
@@ -0,0 +1,268 @@
+import asyncio
+import gc
+import importlib
+import json
+import os
+import selectors
+import signal
+import socket
+import sys
+import time
+import traceback
+from pathlib import Path
+
+def memory(pid):
+    # PSS splits shared pages between the processes mapping them, so per-session figures add up.
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as reader:
+            lines = reader.readlines()
+    except OSError:
+        return None
+    fields = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == "kB":
+            fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+class Zygote:
+    def __init__(self, directory, listener, limit=32):
+        self.directory = Path(directory)
+        self.listener = listener
+        self.limit = limit
+        self.sessions = {}
+        self.connections = {}
+        self.profile = None
+        self.running = True
+
+    def warm(self):
+        # Everything a session imports is loaded once here and shared copy-on-write by every fork.
+        from src.client.client import Client
+        client = Client(self.directory)
+        client.modules.preload()
+        client.modules.resolve("interface")(client).screens.preload()
+
+        # A headless first frame fills textual's stylesheet and rendering caches before anything forks.
+        async def render():
+            async with client.run_test(size=(80, 24)) as pilot:
+                await pilot.pause()
+        asyncio.run(render())
+
+        # userdata.json is parsed and indexed once; sessions adopt this store and only re-read it if it changed.
+        self.profile = client.get_module("profile")
+        self.profile.listeners.clear()
+        self.profile.selected_profile = None
+        # Each session opens its own lock file, since flock is shared by every fork of one descriptor.
+        self.profile.store.close()
+        del client
+        gc.collect()
+        # Frozen objects are skipped by the collector, so it never dirties their shared pages.
+        gc.freeze()
+
+    def run(self):
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "running", False))
+        self.warm()
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        while self.running:
+            for key, _ in self.selector.select(0.2):
+                if key.fileobj is self.listener:
+                    connection, _ = self.listener.accept()
+                    self.receive(connection)
+                else:
+                    self.hangup(key.fileobj)
+            self.reap()
+        self.stop()
+
+    def receive(self, connection):
+        connection.settimeout(5.0)
+        try:
+            data, fds, _, _ = socket.recv_fds(connection, 65536, 3)
+            while data and not data.endswith(b"\n"):
+                chunk = connection.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+            request = json.loads(data)
+        except (OSError, ValueError):
+            connection.close()
+            return
+        connection.settimeout(None)
+
+        if request.get("op") == "sessions":
+            self.reply(connection, self.report())
+            connection.close()
+        elif request.get("op") == "session" and len(fds) == 3:
+            self.spawn(connection, request, fds)
+        else:
+            for fd in fds:
+                os.close(fd)
+            connection.close()
+
+    def reply(self, connection, message):
+        try:
+            connection.sendall(json.dumps(message).encode() + b"\n")
+        except OSError:
+            pass
+
+    def spawn(self, connection, request, fds):
+        if len(self.sessions) >= self.limit:
+            for fd in fds:
+                os.close(fd)
+            self.reply(connection, {"error": f"session limit of {self.limit} reached"})
+            connection.close()
+            return
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            self.child(connection, request, fds)
+        for fd in fds:
+            os.close(fd)
+        self.sessions[pid] = {"connection": connection, "started": time.time()}
+        self.connections[connection] = pid
+        self.selector.register(connection, selectors.EVENT_READ)
+        self.reply(connection, {"pid": pid})
+        print(f"Session {pid} started ({len(self.sessions)} active)", file=sys.stderr, flush=True)
+
+    def child(self, connection, request, fds):
+        status = 1
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            self.selector.close()
+            self.listener.close()
+            for inherited in [connection, *self.connections]:
+                inherited.close()
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+                os.close(fd)
+
+            # The zygote imported textual before this session's terminal settings existed.
+            os.environ.clear()
+            os.environ.update(request["environ"])
+            import textual.constants
+            importlib.reload(textual.constants)
+
+            from src.client.client import Client
+            client = Client(self.directory)
+            if self.profile is not None:
+                self.profile.client = client
+                client.modules.instances["profile"] = self.profile
+                self.profile.refresh()
+            client.run()
+            status = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            try:
+                sys.stdout.flush()
+            finally:
+                os._exit(status)
+
+    def hangup(self, connection):
+        # The launcher went away (the browser closed), so its session goes with it.
+        pid = self.connections.get(connection)
+        try:
+            pending = connection.recv(1)
+        except OSError:
+            pending = b""
+        if not pending and pid is not None:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            self.selector.unregister(connection)
+
+    def reap(self):
+        while self.sessions:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            session = self.sessions.pop(pid, None)
+            if session is None:
+                continue
+            connection = session["connection"]
+            self.connections.pop(connection, None)
+            try:
+                self.selector.unregister(connection)
+            except (KeyError, ValueError):
+                pass
+            code = os.waitstatus_to_exitcode(status)
+            self.reply(connection, {"status": max(code, 0)})
+            connection.close()
+            print(f"Session {pid} ended after {time.time() - session['started']:.0f}s ({len(self.sessions)} active)", file=sys.stderr, flush=True)
+
+    def report(self):
+        now = time.time()
+        sessions = [{"pid": pid, "age": now - session["started"], "memory": memory(pid)} for pid, session in self.sessions.items()]
+        return {"zygote": {"pid": os.getpid(), "memory": memory(os.getpid())}, "sessions": sessions}
+
+    def stop(self):
+        for pid in list(self.sessions):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + 5.0
+        while self.sessions and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.05)
+        self.listener.close()
+
+def listener(path):
+    path.unlink(missing_ok=True)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(str(path))
+    sock.listen(64)
+    return sock
+
+def sessions(path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(str(path))
+        connection.sendall(json.dumps({"op": "sessions"}).encode() + b"\n")
+        return json.loads(connection.makefile("r").readline())
+
+def table(report):
+    lines = [f"{'pid':>8}{'age':>8}{'pss':>12}{'private':>12}{'shared':>12}"]
+    rows = [("zygote", report["zygote"])] + [(session["pid"], session) for session in report["sessions"]]
+    for pid, entry in rows:
+        usage = entry["memory"] or {}
+        age = f"{entry['age']:.0f}s" if "age" in entry else "-"
+        lines.append(f"{pid:>8}{age:>8}" + "".join(f"{usage.get(field, 0) / 1048576:>10.1f}MB" for field in ("pss", "private", "shared")))
+    return "\n".join(lines)
+
+def serve(directory, host="127.0.0.1", port=8000, limit=32, public_url=None):
+    directory = Path(directory)
+    socket_path = directory / ".shh" / "web.sock"
+    zygote_socket = listener(socket_path)
+
+    # Forked before aiohttp or textual are imported here, so neither is duplicated into the zygote.
+    zygote = os.fork()
+    if zygote == 0:
+        status = 0
+        try:
+            Zygote(directory, zygote_socket, limit).run()
+        except BaseException:
+            traceback.print_exc()
+            status = 1
+        finally:
+            os._exit(status)
+    zygote_socket.close()
+
+    from .gateway import Gateway
+    try:
+        Gateway(socket_path, host=host, port=port, public_url=public_url).serve()
+    finally:
+        os.kill(zygote, signal.SIGTERM)
+        os.waitpid(zygote, 0)
+        socket_path.unlink(missing_ok=True)
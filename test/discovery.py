@@ -0,0 +1,64 @@
+import asyncio
+import socket
+import sys
+import time
+from pathlib import Path
+
+import msgpack
+
+root = Path(__file__).parent.parent
+sys.path.append(str(root))
+
+from src.client.headless import Headless
+from src.client.modules.discovery.discovery import Discovery
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+async def loopback(count=100, duration=10.0):
+    port = free_port()
+    nodes = []
+    for index in range(count):
+        client = Headless(root / "test")
+        discovery = Discovery(client, port=port, interface="127.0.0.1", interval=0.2, maximum=3.0)
+        client.modules.instances["discovery"] = discovery
+        await discovery.start(f"peer-{index}", 40000 + index, rooms=[f"room-{index % 5}"])
+        nodes.append((client, discovery))
+
+    started = time.monotonic()
+    converged = None
+    while time.monotonic() - started < duration:
+        await asyncio.sleep(0.1)
+        if converged is None and all(len(discovery.peers) == count - 1 for _, discovery in nodes):
+            converged = time.monotonic() - started
+    # Metrics are process-wide, so this counter already totals every node.
+    sent = nodes[0][1].announcements.value
+    graph = nodes[0][0].get_module("graph")
+
+    for client, _ in nodes:
+        await client.stop()
+    return converged, sent, len(graph.neighbours("peer-0"))
+
+def readdress():
+    client = Headless(root / "test")
+    discovery = Discovery(client)
+    network = client.get_module("network")
+    events = []
+    discovery.subscribe(lambda event, peer: events.append(event))
+    # The same peer announces again after restarting on a new port, well inside the expiry window.
+    for port in (41000, 41001):
+        discovery.received(msgpack.packb({"id": "peer-1", "port": port, "rooms": ["general"]}), ("127.0.0.1", 5000))
+    return network.addresses.get("peer-1") == ("127.0.0.1", 41001) and events == ["found", "changed"]
+
+if __name__ == "__main__":
+    from src.client.modules.metrics import metrics
+    metrics.enable()
+    converged, sent, neighbours = asyncio.run(loopback())
+    print(f"converged in {converged:.2f}s" if converged is not None else "did not converge")
+    print(f"{sent} announcements in 10s from 100 peers ({sent / 1000:.1f}/peer/s)")
+    print(f"peer-0 graph neighbours: {neighbours}")
+    assert converged is not None, "peers did not discover each other"
+    assert readdress(), "a re-announced port did not reach the network module"
+    print("readdress: network dials the new port")
@@ -0,0 +1,39 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+root = Path(__file__).parent.parent
+sys.path.append(str(root))
+
+from src.client.modules.graph.graph import Graph
+
+def topology(graph, nodes, degree, generator):
+    for peer in range(1, nodes):
+        for _ in range(degree // 2):
+            graph.add_edge(peer, generator.randrange(peer))
+
+def churn(capacity, nodes=10000, degree=4, rounds=2000, lookups=50, seed=7):
+    generator = random.Random(seed)
+    graph = Graph(None, capacity=capacity)
+    topology(graph, nodes, degree, generator)
+    sources = [generator.randrange(nodes) for _ in range(8)]
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        first, second = generator.randrange(nodes), generator.randrange(nodes)
+        if generator.random() < 0.5:
+            graph.add_edge(first, second)
+        else:
+            neighbours = graph.neighbours(first)
+            if neighbours:
+                graph.remove_edge(first, generator.choice(neighbours))
+        for _ in range(lookups):
+            graph.next_hop(generator.choice(sources), generator.randrange(nodes))
+    return (time.perf_counter() - started) / (rounds * lookups)
+
+if __name__ == "__main__":
+    cached = churn(capacity=64)
+    uncached = churn(capacity=0, rounds=20)
+    print(f"cached:   {cached * 1e6:.1f}us per lookup")
+    print(f"uncached: {uncached * 1e6:.1f}us per lookup ({uncached / cached:.1f}x)")
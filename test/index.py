@@ -0,0 +1,131 @@
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+root = Path(__file__).parent.parent
+sys.path.append(str(root))
+
+from src.client.headless import Headless
+from src.client.modules.history.other.log import Log
+from src.client.modules.index.other.shard import Shard
+
+WORDS = ["foo", "bar", "baz", "fooBar", "bar_baz", "src/app/main.py", "config", "deploy", "error", "retry"]
+
+def body(generator, offset):
+    words = generator.choices(WORDS, k=8)
+    # Every 997th message carries an identifier nothing else shares.
+    if offset % 997 == 0:
+        words.append(f"needle{offset}")
+    return " ".join(words)
+
+def appends(directory, count=150000):
+    client = Headless(directory)
+    history = client.get_module("history")
+    index = client.get_module("index")
+    generator = random.Random(5)
+    slowest = 0.0
+    started = time.perf_counter()
+    # Costs are the calling thread's CPU time: what an append or query takes from the UI thread,
+    # independent of background merges and of whatever else shares the machine.
+    for offset in range(count):
+        before = time.thread_time()
+        history.append("general", {"sender": "user", "body": body(generator, offset)})
+        slowest = max(slowest, time.thread_time() - before)
+    elapsed = time.perf_counter() - started
+    shard = index.shard("general")
+    # Appends that found the shard busy were left to the background catch_up; queries wait for it.
+    while shard.stale or index.rebuilding:
+        if not index.rebuilding:
+            index.rebuild("general")
+        time.sleep(0.01)
+    print(f"appends: {count} in {elapsed:.1f}s, slowest {slowest * 1000:.1f}ms, {len(shard.segments)} segments")
+
+    timings = {}
+    for query in ("fooBar_baz", "needle997", "deploy error"):
+        index.search(query)
+        started = time.thread_time()
+        results = index.search(query)
+        timings[query] = (time.thread_time() - started, results)
+        print(f"query {query!r}: {len(results)} results in {timings[query][0] * 1000:.1f}ms")
+
+    # The identifier's own term outranks messages that only share its "needle" part.
+    needles = [result["offset"] for result in index.search("needle997")]
+    common = timings["fooBar_baz"][1]
+    ok = needles[0] == 997 and len(common) == 20
+    ok = ok and all("foo" in result["message"]["body"].lower() for result in common)
+    ok = ok and slowest < 0.5 and timings["fooBar_baz"][0] < 0.5
+
+    client.modules.get("index").close()
+    client.modules.get("history").close()
+    reopened = Headless(directory)
+    reopened.get_module("index")
+    again = reopened.get_module("index").search("needle997")
+    ok = ok and [result["offset"] for result in again] == needles
+    reopened.get_module("index").close()
+    reopened.get_module("history").close()
+    return ok
+
+def close_during_catch_up(directory, count=30000):
+    client = Headless(directory)
+    history = client.get_module("history")
+    generator = random.Random(9)
+    for offset in range(count):
+        history.append("general", {"sender": "user", "body": body(generator, offset)})
+
+    errors = []
+    threading.excepthook = lambda arguments: errors.append(arguments.exc_value)
+    # The index opens behind the log, so a catch_up thread is still reading when shutdown starts.
+    index = client.get_module("index")
+    shard = index.shard("general")
+    index.close()
+    history.close()
+    checkpoint = shard.checkpoint_path.stat().st_mtime_ns
+    time.sleep(0.2)
+    ok = not errors and not index.rebuilding and shard.checkpoint_path.stat().st_mtime_ns == checkpoint
+    print(f"close during catch-up: stopped at offset {shard.next} of {count}, {len(errors)} thread errors")
+    return ok
+
+def lost_tail(directory, early):
+    log = Log(directory / "log")
+    shard = Shard(directory / "index", log)
+    for offset in range(10):
+        shard.add(log.append({"body": f"old{offset}"}), {"body": f"old{offset}"})
+        if offset == 4:
+            log.sync()
+            kept = log.segments[-1].path.stat().st_size
+    log.sync()
+    shard.close()
+    log.close()
+
+    # The checkpoint reached disk but the last five history records did not.
+    with open(log.segments[-1].path, "r+b") as writer:
+        writer.truncate(kept)
+    log = Log(directory / "log")
+    # The index reopens either before the refill or after it has already passed the old checkpoint.
+    fresh = range(10) if early else range(12)
+    if early:
+        shard = Shard(directory / "index", log)
+    for number in fresh:
+        log.append({"body": f"fresh{number}"})
+    if not early:
+        shard = Shard(directory / "index", log)
+    shard.catch_up()
+    # Only the five surviving "old" messages may match; offset 7 now holds "fresh2".
+    ok = log.next == 5 + len(fresh) and all(offset < 5 for offset, _ in shard.search("old7"))
+    ok = ok and [offset for offset, _ in shard.search("fresh2")][:1] == [7]
+    print(f"lost tail ({'before' if early else 'after'} refill): log at {log.next}, shard at {shard.next}")
+    shard.close()
+    log.close()
+    return ok
+
+if __name__ == "__main__":
+    results = []
+    for test in (appends, close_during_catch_up, lambda directory: lost_tail(directory, True), lambda directory: lost_tail(directory, False)):
+        with tempfile.TemporaryDirectory() as directory:
+            results.append(test(Path(directory)))
+    success = all(results)
+    print("ok" if success else "FAILED")
+    sys.exit(0 if success else 1)
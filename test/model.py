@@ -0,0 +1,98 @@
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import msgpack
+
+root = Path(__file__).parent.parent
+sys.path.append(str(root))
+
+from src.client.modules.interface.other.screens.room_selector.other.room import Room
+from src.client.modules.model.model import Message, Peer
+from src.client.modules.model.other.window import Window
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+def usernames(count):
+    return [f"user-{index:05d}" for index in range(count)]
+
+def encoded_messages(count, senders):
+    # Both sides decode from msgpack, as History hands messages out, so no string is shared up front.
+    generator = random.Random(7)
+    return [msgpack.packb({"id": f"{index:032x}", "room": "general", "sender": generator.choice(senders), "time": 1.7e9 + index, "body": "x" * generator.randint(16, 96)}) for index in range(count)]
+
+def compare(label, legacy, compact, count):
+    _, legacy_size = measure(legacy)
+    _, compact_size = measure(compact)
+    print(f"{label:<28}{legacy_size / count:>10.0f} B{compact_size / count:>10.0f} B{legacy_size / compact_size:>8.1f}x")
+    return legacy_size, compact_size
+
+class LegacyRoom:
+    def __init__(self, name, description=""):
+        self.name = name
+        self.description = description
+        self.peers = {}
+        self.order = None
+        self.positions = None
+
+def benchmark(message_count=100000, room_count=2000, peers_per_room=50):
+    senders = usernames(500)
+    raw = encoded_messages(message_count, senders)
+    print(f"{'':<28}{'dicts':>12}{'compact':>12}{'saved':>8}")
+
+    results = []
+    results.append(compare("message window", lambda: [msgpack.unpackb(data) for data in raw], lambda: Window.from_messages(0, (msgpack.unpackb(data) for data in raw)), message_count))
+    results.append(compare("message objects", lambda: [msgpack.unpackb(data) for data in raw], lambda: [Message.from_dict(msgpack.unpackb(data)) for data in raw], message_count))
+
+    members = [[(senders[(room + index) % len(senders)], f"10.0.{room % 256}.{index}", 40000 + index) for index in range(peers_per_room)] for room in range(room_count)]
+    def legacy_rooms():
+        rooms = []
+        for room, peers in enumerate(members):
+            current = LegacyRoom(f"room-{room}")
+            for name, host, port in peers:
+                current.peers[msgpack.unpackb(msgpack.packb(name))] = {"host": host, "port": port, "rooms": [current.name], "seen": 0.0}
+            rooms.append(current)
+        return rooms
+    def compact_rooms():
+        rooms = []
+        for room, peers in enumerate(members):
+            current = Room(f"room-{room}")
+            for name, host, port in peers:
+                peer = Peer(msgpack.unpackb(msgpack.packb(name)), host, port, (current.name,))
+                current.join(peer.name, peer)
+            rooms.append(current)
+        return rooms
+    results.append(compare("room members", legacy_rooms, compact_rooms, room_count * peers_per_room))
+
+    window = Window.from_messages(0, (msgpack.unpackb(data) for data in raw[:4096]))
+    started = time.perf_counter()
+    for _ in range(50):
+        restored = Window.unpack(msgpack.unpackb(msgpack.packb(window.pack())))
+    columnar = (time.perf_counter() - started) / 50
+    decoded = [msgpack.unpackb(data) for data in raw[:4096]]
+    started = time.perf_counter()
+    for _ in range(50):
+        msgpack.unpackb(msgpack.packb(decoded))
+    maps = (time.perf_counter() - started) / 50
+    print(f"msgpack round trip of 4096 messages: {columnar * 1000:.2f}ms columnar vs {maps * 1000:.2f}ms as maps")
+
+    assert list(restored.rows()) == list(window.rows())
+    assert restored[5].sender == decoded[5]["sender"] and restored[5].body == decoded[5]["body"]
+    message = Message.from_dict(decoded[5])
+    assert Message.unpack(msgpack.unpackb(msgpack.packb(message.pack()))).to_dict() == message.to_dict()
+    assert Peer.unpack(msgpack.unpackb(msgpack.packb(Peer("a", "h", 1, ("r",)).pack()))).rooms == ("r",)
+    return all(compact < legacy for legacy, compact in results)
+
+if __name__ == "__main__":
+    success = benchmark()
+    print("ok" if success else "FAILED")
+    sys.exit(0 if success else 1)
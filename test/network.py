@@ -0,0 +1,68 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import msgpack
+
+root = Path(__file__).parent.parent
+sys.path.append(str(root))
+
+from src.client.modules.network.network import Network
+from src.client.modules.network.other.frame import HEADER
+
+async def loopback(count=50000):
+    sender = Network(None)
+    receiver = Network(None)
+    received = 0
+    done = asyncio.Event()
+
+    def on_message(connection, message):
+        nonlocal received
+        received += 1
+        if received == count:
+            done.set()
+
+    receiver.on("message", on_message)
+    port = await receiver.listen()
+
+    started = time.perf_counter()
+    for sequence in range(count):
+        await sender.send("127.0.0.1", port, {"type": "message", "room": "loopback", "sequence": sequence, "body": "hello"})
+    await asyncio.wait_for(done.wait(), timeout=60)
+    elapsed = time.perf_counter() - started
+
+    await sender.stop()
+    await receiver.stop()
+    return count / elapsed
+
+def frame(payload):
+    return HEADER.pack(len(payload)) + payload
+
+async def malformed():
+    receiver = Network(None)
+    received = []
+    receiver.on("message", lambda connection, message: received.append(message["body"]))
+    port = await receiver.listen()
+    errors = []
+    asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+
+    # An empty frame and a truncated object are dropped; the frames around them still arrive.
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(frame(msgpack.packb({"type": "message", "body": "before"})) + frame(b"") + frame(b"\x92\x01"))
+    writer.write(frame(msgpack.packb({"type": "message", "body": "after"})))
+    await writer.drain()
+    for _ in range(100):
+        if len(received) == 2:
+            break
+        await asyncio.sleep(0.01)
+    writer.close()
+    await receiver.stop()
+    return received == ["before", "after"] and not errors
+
+if __name__ == "__main__":
+    assert asyncio.run(malformed()), "malformed frames were not contained"
+    print("malformed frames: dropped without affecting the frames around them")
+    rate = asyncio.run(loopback())
+    print(f"{rate:,.0f} messages/s")
+    assert rate > 1000, "loopback throughput regressed"
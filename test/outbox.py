@@ -0,0 +1,114 @@
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+root = Path(__file__).parent.parent
+sys.path.append(str(root))
+
+from src.client.modules.outbox.outbox import Outbox
+
+class Network:
+    def __init__(self):
+        self.handlers = {}
+        self.dispatched = []
+
+    def on(self, kind, handler):
+        self.handlers[kind] = handler
+
+    def dispatch(self, connection, message):
+        self.dispatched.append(message["body"])
+
+class Connection:
+    def __init__(self, network, deliver):
+        self.network = network
+        self.deliver = deliver
+
+    async def send(self, message):
+        self.deliver(message)
+
+    def send_nowait(self, message):
+        self.deliver(message)
+        return True
+
+async def lost_ack(directory):
+    sender = Outbox(None, directory / "sender", batch_count=2, timeout=0.05)
+    receiver = Outbox(None, directory / "receiver")
+    sender.open("alice")
+    # Interleaved destinations leave gaps in each one's sequence numbers: bob gets 1, 3, 5, 7.
+    for index in range(8):
+        sender.enqueue("bob" if index % 2 == 0 else "carol", {"type": "message", "body": f"m{index + 1}"})
+
+    inbox = Network()
+    acks = []
+    # Messages arrive on the receiver's side of the link, whose network records what it dispatches.
+    to_sender = Connection(inbox, acks.append)
+    to_receiver = Connection(Network(), lambda message: receiver.on_batch(to_sender, message))
+
+    # The first batch, sequences 1 and 3, is delivered but its ack never arrives.
+    await sender.flush("bob", to_receiver, delay=False)
+    ok = inbox.dispatched == ["m1", "m3"] and sender.pending("bob") == 4
+    acks.clear()
+
+    # The retry carries 1, 3, 5 and 7; only 5 and 7 are new.
+    sender.batch_count = 256
+    to_sender.deliver = lambda message: sender.on_ack(to_receiver, message)
+    await sender.flush("bob", to_receiver, delay=False)
+    ok = ok and inbox.dispatched == ["m1", "m3", "m5", "m7"] and sender.pending("bob") == 0
+
+    # Carol's 2, 4, 6, 8 are below bob's high-water mark but are still delivered.
+    await sender.flush("carol", to_receiver, delay=False)
+    ok = ok and inbox.dispatched == ["m1", "m3", "m5", "m7", "m2", "m4", "m6", "m8"]
+    print(f"lost ack: delivered {' '.join(inbox.dispatched)}")
+    sender.close()
+    return ok
+
+async def restart(directory):
+    outbox = Outbox(None, directory)
+    outbox.open("alice")
+    for index in range(2000):
+        outbox.enqueue("bob", {"type": "message", "body": f"m{index}"})
+    # Acknowledging everything triggers compaction, which leaves no message records behind.
+    outbox.on_ack(None, {"destination": "bob", "last": 2000})
+    compacted = outbox.path.stat().st_size
+    outbox.close()
+
+    reopened = Outbox(None, directory)
+    reopened.open("alice")
+    sequence = reopened.enqueue("bob", {"type": "message", "body": "after"})
+    reopened.close()
+    print(f"restart: compacted log {compacted} bytes, next sequence {sequence}")
+    return compacted < 64 and sequence == 2001
+
+async def torn_tail(directory):
+    outbox = Outbox(None, directory)
+    outbox.open("alice")
+    for index in range(3):
+        outbox.enqueue("bob", {"type": "message", "body": f"m{index}"})
+    outbox.close()
+
+    # A crash mid-write leaves the last record incomplete.
+    with open(outbox.path, "r+b") as writer:
+        writer.truncate(outbox.path.stat().st_size - 4)
+    outbox.open("alice")
+    outbox.enqueue("bob", {"type": "message", "body": "after"})
+    outbox.close()
+
+    reopened = Outbox(None, directory)
+    reopened.open("alice")
+    bodies = [message["body"] for _, message in reopened.queues["bob"]]
+    reopened.close()
+    print(f"torn tail: reopened with {' '.join(bodies)}")
+    return bodies == ["m0", "m1", "after"]
+
+async def main():
+    results = []
+    for test in (lost_ack, restart, torn_tail):
+        with tempfile.TemporaryDirectory() as directory:
+            results.append(await test(Path(directory)))
+    return all(results)
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    print("ok" if success else "FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,47 @@
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+root = Path(__file__).parent.parent
+sys.path.append(str(root))
+
+from src.client.headless import Headless
+
+async def late_join(directory, tick=0.05):
+    nodes = []
+    for name in ("alice", "bob"):
+        client = Headless(directory / name)
+        network = client.get_module("network")
+        presence = client.get_module("presence")
+        presence.tick = tick
+        presence.start(name, network)
+        nodes.append((client, network, presence, await network.listen()))
+    (alice, alice_network, alice_presence, alice_port), (bob, bob_network, bob_presence, _) = nodes
+
+    # Alice publishes her starting state and a change long before bob connects.
+    alice_presence.set_status("away")
+    await asyncio.sleep(tick * 6)
+    connection = await bob_network.connect("127.0.0.1", alice_port)
+    await connection.send({"type": "hello"})
+
+    async def settle():
+        while "alice" not in bob_presence.remote or "bob" not in alice_presence.remote:
+            await asyncio.sleep(tick)
+    try:
+        await asyncio.wait_for(settle(), tick * 40)
+    except asyncio.TimeoutError:
+        pass
+    ok = bob_presence.remote.get("alice") == {"status": "away", "typing": None}
+    ok = ok and alice_presence.remote.get("bob") == {"status": "active", "typing": None}
+    print(f"late join: bob sees {bob_presence.remote.get('alice')}, alice sees {alice_presence.remote.get('bob')}")
+
+    for client, *_ in nodes:
+        await client.stop()
+    return ok
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        success = asyncio.run(late_join(Path(directory)))
+    print("ok" if success else "FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+root = Path(__file__).parent.parent
+sys.path.append(str(root))
+
+from src.client.headless import Headless
+
+async def until(condition, timeout=30):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.005)
+    await asyncio.wait_for(poll(), timeout)
+
+async def transfer(directory):
+    sender = Headless(directory / "sender")
+    receiver = Headless(directory / "receiver")
+    outgoing = sender.get_module("share")
+    incoming = receiver.get_module("share")
+    # Small chunks and a window of one keep the transfer slow enough to cut it off halfway.
+    outgoing.chunks.chunk_size = 64 * 1024
+    outgoing.window = 1
+
+    completed = []
+    incoming.subscribe(lambda manifest, target: completed.append(target))
+    chunks = 0
+    def count(connection, message):
+        nonlocal chunks
+        chunks += 1
+    receiver.get_module("network").on("share.chunk", count)
+
+    sender_port = await sender.get_module("network").listen()
+    receiver_port = await receiver.get_module("network").listen()
+
+    source = directory / "random.bin"
+    source.write_bytes(os.urandom(4 * 1024 * 1024 + 123))
+    # The receiver has never called send or resume; its handlers come from being built.
+    connection = await sender.get_module("network").connect("127.0.0.1", receiver_port)
+    manifest = await outgoing.send(connection, source)
+    await until(lambda: 0 < len(incoming.incoming.get(manifest["id"], {}).get("remaining", ())) < len(manifest["chunks"]) // 2)
+    await connection.close()
+    cut = len(incoming.incoming[manifest["id"]]["remaining"])
+
+    # The receiver reconnects and asks only for what is still missing.
+    before = chunks
+    resumed = await receiver.get_module("network").connect("127.0.0.1", sender_port)
+    incoming.resume(resumed)
+    await asyncio.wait_for(outgoing.wait(manifest["id"]), 30)
+    target = receiver.directory / ".shh" / "downloads" / "random.bin"
+    ok = completed == [target] and target.read_bytes() == source.read_bytes()
+    ok = ok and chunks - before <= cut + outgoing.window
+    print(f"transfer: {len(manifest['chunks'])} chunks, cut with {cut} missing, {chunks - before} re-sent after resume")
+
+    # Offering a file the receiver already holds completes without any chunk traffic.
+    before = chunks
+    connection = await sender.get_module("network").connect("127.0.0.1", receiver_port)
+    again = await outgoing.send(connection, source)
+    await asyncio.wait_for(outgoing.wait(again["id"]), 30)
+    ok = ok and chunks == before and len(completed) == 2
+    print(f"re-send: {chunks - before} chunks transferred")
+
+    await sender.stop()
+    await receiver.stop()
+    return ok
+
+async def hostile(directory):
+    attacker = Headless(directory / "attacker")
+    victim = Headless(directory / "victim")
+    share = victim.get_module("share")
+    port = await victim.get_module("network").listen()
+    connection = await attacker.get_module("network").connect("127.0.0.1", port)
+
+    digest = hashlib.sha256(b"payload").hexdigest()
+    offers = [
+        {"id": "../../evil", "name": "evil", "size": 7, "chunk_size": 7, "chunks": [digest]},
+        {"id": hashlib.sha256(digest.encode()).hexdigest(), "name": "evil", "size": 7, "chunk_size": 7, "chunks": ["../../../evil"]},
+        {"id": "0" * 64, "name": "evil", "size": 7, "chunk_size": 7, "chunks": [digest]},
+        {"id": hashlib.sha256(digest.encode()).hexdigest(), "name": "evil", "size": "7", "chunk_size": 7, "chunks": [digest]},
+        {"name": "evil"},
+    ]
+    for offer in offers:
+        await connection.send({"type": "share.offer", **offer})
+    await connection.send({"type": "share.chunk", "id": "../../evil", "hash": "../../evil", "data": b"payload"})
+
+    # A well-formed offer behind the hostile ones proves they were read and dropped.
+    wanted = asyncio.Event()
+    attacker.get_module("network").on("share.want", lambda connection, message: wanted.set())
+    good = {"id": hashlib.sha256(digest.encode()).hexdigest(), "name": "../../ok", "size": 7, "chunk_size": 7, "chunks": [digest]}
+    await connection.send({"type": "share.offer", **good})
+    await asyncio.wait_for(wanted.wait(), 10)
+
+    manifests = sorted(path.name for path in share.chunks.manifests.iterdir())
+    escaped = [path for path in directory.rglob("*evil*")]
+    ok = manifests == [good["id"]] and not escaped and list(share.incoming) == [good["id"]]
+    print(f"hostile offers: {len(offers)} rejected, manifests kept {len(manifests)}")
+
+    # Validly hashed chunks nobody asked for are neither stored nor acked; the wanted one still is.
+    acks = []
+    attacker.get_module("network").on("share.ack", lambda connection, message: acks.append(message["hash"]))
+    unsolicited = hashlib.sha256(b"filler").hexdigest()
+    for identifier in (good["id"], "0" * 64):
+        await connection.send({"type": "share.chunk", "id": identifier, "hash": unsolicited, "data": b"filler"})
+    await connection.send({"type": "share.chunk", "id": good["id"], "hash": digest, "data": b"payload"})
+    await until(lambda: acks)
+    await asyncio.sleep(0.05)
+    ok = ok and acks == [digest] and not share.chunks.has(unsolicited) and share.chunks.has(digest)
+    print(f"unsolicited chunks: stored {share.chunks.has(unsolicited)}, {len(acks)} ack(s) for 3 chunks sent")
+
+    await attacker.stop()
+    await victim.stop()
+    return ok
+
+async def main():
+    results = []
+    for test in (transfer, hostile):
+        with tempfile.TemporaryDirectory() as directory:
+            results.append(await test(Path(directory)))
+    return all(results)
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    print("ok" if success else "FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,54 @@
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root = Path(__file__).parent.parent
+
+FIRST_FRAME = """
+import asyncio, sys, time
+started = time.perf_counter()
+sys.path.append({root!r})
+from src.client.client import Client
+
+async def main():
+    async with Client({directory!r}).run_test(headless=True) as pilot:
+        await pilot.pause()
+        print(time.perf_counter() - started)
+
+asyncio.run(main())
+"""
+
+def command(arguments):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "src.cli.index", *arguments], cwd=root, check=True, capture_output=True)
+    return time.perf_counter() - started
+
+def first_frame(directory):
+    script = FIRST_FRAME.format(root=str(root), directory=str(directory))
+    output = subprocess.run([sys.executable, "-c", script], cwd=root, check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+def median(measure, runs=5):
+    return statistics.median(measure() for _ in range(runs))
+
+if __name__ == "__main__":
+    budgets = {"about": 0.5, "first frame": 2.0}
+
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = Path(scratch)
+        shutil.copytree(root / "test" / ".shh", directory / ".shh")
+        results = {
+            "about": median(lambda: command(["about"])),
+            "first frame": median(lambda: first_frame(directory)),
+        }
+
+    failed = False
+    for name, elapsed in results.items():
+        status = "ok" if elapsed <= budgets[name] else "OVER BUDGET"
+        failed = failed or elapsed > budgets[name]
+        print(f"{name:12} {elapsed * 1000:8.1f}ms  (budget {budgets[name] * 1000:.0f}ms) {status}")
+    sys.exit(1 if failed else 0)
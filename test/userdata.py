@@ -0,0 +1,71 @@
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root = Path(__file__).parent.parent
+sys.path.append(str(root))
+
+from src.client.modules.profile.other.store import Store
+
+def writer(path, worker, count, barrier):
+    store = Store(path, threshold=32)
+    store.load()
+    barrier.wait()
+    for index in range(count):
+        store.create({"username": f"user-{worker}-{index}", "isLastUsed": True, "social": {"alias": ""}})
+        store.switch(f"user-{(worker + 1) % 4}-{index // 2}")
+        store.refresh()
+    store.close()
+
+def contention(processes=4, count=200):
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "userdata.json"
+        Store(path).load()
+        barrier = multiprocessing.Barrier(processes)
+        workers = [multiprocessing.Process(target=writer, args=(path, worker, count, barrier)) for worker in range(processes)]
+        started = time.perf_counter()
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        store = Store(path)
+        store.load()
+        expected = processes * count
+        found = len(store.data["profiles"])
+        marked = sum(1 for profile in store.data["profiles"] if profile.get("isLastUsed"))
+        print(f"contention: {expected} creates from {processes} processes in {elapsed:.2f}s, {found} profiles on disk, {marked} marked last used")
+        return found == expected and marked == 1
+
+def revalidation(rounds=20000):
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "userdata.json"
+        reader, other = Store(path), Store(path)
+        reader.load()
+        other.load()
+        for index in range(500):
+            other.create({"username": f"user-{index}", "isLastUsed": True, "social": {"alias": ""}})
+        reader.refresh()
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            reader.refresh()
+        unchanged = (time.perf_counter() - started) / rounds
+
+        started = time.perf_counter()
+        for _ in range(rounds // 10):
+            reader.load()
+        full = (time.perf_counter() - started) / (rounds // 10)
+
+        other.create({"username": "late", "isLastUsed": True, "social": {"alias": ""}})
+        reader.refresh()
+        print(f"revalidation: unchanged refresh {unchanged * 1e6:.1f}us vs full reload {full * 1e6:.1f}us ({full / unchanged:.0f}x)")
+        return reader.exists("late") and len(reader.data["profiles"]) == 501
+
+if __name__ == "__main__":
+    results = [contention(), revalidation()]
+    print("ok" if all(results) else "FAILED")
+    sys.exit(0 if all(results) else 1)